@@ -9,12 +9,27 @@ import json
 import csv
 import time
 import threading
+import itertools
+import heapq
 import random
+import asyncio
+import ssl
+import socket
+import select
+import base64
+import tempfile
+import contextlib
+import queue
 import uuid
 import re
+import sys
 import imaplib
+import sqlite3
 import email
-from collections import defaultdict
+import zlib
+from collections import defaultdict, Counter
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import datetime
 
 # --- NEW: Import settings from the config file ---
@@ -24,18 +39,29 @@ import config
 ctk.set_appearance_mode(config.DEFAULT_APPEARANCE_MODE)
 ctk.set_default_color_theme(config.DEFAULT_COLOR_THEME)
 
+# Compiled once; used for every message sent and every template preview
+HTML_TAG_PATTERN = re.compile('<.*?>')
+# Applied to lower-cased addresses: a plain local part and a dotted domain with valid labels
+EMAIL_PATTERN = re.compile(r"[a-z0-9.!#$%&'*+/=?^_`{|}~-]+@(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z0-9-]{2,63}")
+# Used to pull Message-IDs and UIDs out of raw IMAP FETCH responses
+MESSAGE_ID_PATTERN = re.compile(rb'<[^<>\s]+>')
+IMAP_UID_PATTERN = re.compile(rb'UID (\d+)')
+# Delivery status notifications (bounces) are sent as multipart/report
+DSN_CONTENT_TYPE_PATTERN = re.compile(rb'^content-type:\s*multipart/report', re.IGNORECASE | re.MULTILINE)
+
 # ------------------------- 2. Initialization Section ------------------------ #
 # Use file/dir names from the config file
 files_to_check = [
     config.SMTP_FILE, config.SUBJECTS_FILE, config.EMAIL_BODIES_FILE,
-    config.FOLLOWUP_BODIES_FILE, config.BLACKLIST_FILE, config.NOTIFICATIONS_FILE
+    config.FOLLOWUP_BODIES_FILE, config.BLACKLIST_FILE, config.NOTIFICATIONS_FILE,
+    config.IMAP_SYNC_STATE_FILE, config.RATE_LIMIT_STATE_FILE
 ]
 
 for file in files_to_check:
     if not os.path.exists(file):
         with open(file, 'w') as f:
-            # Initialize blacklist as a dictionary
-            if file == config.BLACKLIST_FILE:
+            # Initialize blacklist, IMAP sync state and rate limit state as dictionaries
+            if file in (config.BLACKLIST_FILE, config.IMAP_SYNC_STATE_FILE, config.RATE_LIMIT_STATE_FILE):
                 json.dump({}, f)
             else:
                 json.dump([], f)
@@ -44,7 +70,1755 @@ for directory in [config.LOG_DIR, config.BODIES_DIR]:
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-# ------------------------- 3. Main Application Class ------------------------ #
+# ------------------------- 3. Delivery Helpers ------------------------ #
+class SMTPConnectionPool:
+    """Keeps one authenticated SMTP session alive per account and reuses it across sends."""
+
+    def __init__(self, max_messages=100, noop_after=30, timeout=10):
+        self.max_messages = max_messages
+        self.noop_after = noop_after
+        self.timeout = timeout
+        self._sessions = {}  # account email -> {'server', 'messages', 'last_used'}
+        self._locks = defaultdict(threading.Lock)
+        # Guards _locks and changes to _sessions (each session is used under its account's lock)
+        self._guard = threading.Lock()
+
+    def _lock_for(self, account_email):
+        with self._guard:
+            return self._locks[account_email]
+
+    def _connect(self, smtp):
+        server = smtplib.SMTP(smtp.get('smtp_host', 'smtp.gmail.com'), smtp.get('smtp_port', 587), timeout=self.timeout)
+        # Accounts may set "smtp_starttls": false in smtp_list.json, e.g. for a plain local test server
+        if smtp.get('smtp_starttls', True):
+            server.starttls()
+        server.login(smtp['email'], smtp['password'])
+        return {'server': server, 'messages': 0, 'last_used': time.time()}
+
+    def _is_healthy(self, session):
+        """Sessions that sat idle are probed with NOOP before being reused."""
+        if time.time() - session['last_used'] < self.noop_after:
+            return True
+        try:
+            code, _ = session['server'].noop()
+            return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self, account_email):
+        with self._guard:
+            session = self._sessions.pop(account_email, None)
+        if not session:
+            return
+        try:
+            session['server'].quit()
+        except Exception:
+            try:
+                session['server'].close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_disconnect(error):
+        """True when the server dropped the connection (or announced it with 421)."""
+        if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError)):
+            return True
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code == 421
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return any(code == 421 for code, _ in error.recipients.values())
+        return False
+
+    def sendmail(self, smtp, to_email, msg_string):
+        """Sends one message over the account's pooled session, reconnecting once if it was dropped."""
+        account_email = smtp['email']
+        with self._lock_for(account_email):
+            for attempt in range(2):
+                session = self._sessions.get(account_email)
+                if session and (session['messages'] >= self.max_messages or not self._is_healthy(session)):
+                    self._discard(account_email)
+                    session = None
+                if session is None:
+                    session = self._connect(smtp)
+                    with self._guard:
+                        self._sessions[account_email] = session
+
+                try:
+                    session['server'].sendmail(account_email, to_email, msg_string)
+                except Exception as e:
+                    if self._is_disconnect(e):
+                        self._discard(account_email)
+                        if attempt == 0:
+                            print(f"[SMTP POOL] Session for {account_email} was dropped ({e}). Reconnecting...")
+                            continue
+                    elif not isinstance(e, smtplib.SMTPException):
+                        self._discard(account_email)
+                    raise
+
+                session['messages'] += 1
+                session['last_used'] = time.time()
+                return
+
+    def close(self, account_email):
+        with self._lock_for(account_email):
+            self._discard(account_email)
+
+    def close_idle(self, max_idle):
+        """Closes sessions that have not sent anything for max_idle seconds."""
+        now = time.time()
+        with self._guard:
+            account_emails = list(self._sessions)
+        for account_email in account_emails:
+            lock = self._lock_for(account_email)
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                session = self._sessions.get(account_email)
+                if session and now - session['last_used'] >= max_idle:
+                    self._discard(account_email)
+            finally:
+                lock.release()
+
+    def close_all(self):
+        with self._guard:
+            account_emails = list(self._sessions)
+        for account_email in account_emails:
+            self.close(account_email)
+
+AUTH_FAILURE_CODES = {530, 534, 535}
+
+
+def smtp_error_code(error):
+    """Extracts the SMTP reply code from an smtplib exception, if it carries one."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code
+    if isinstance(error, smtplib.SMTPRecipientsRefused) and error.recipients:
+        return next(iter(error.recipients.values()))[0]
+    return None
+
+
+def classify_smtp_error(error):
+    """
+    Sorts a send failure into 'auth' (bad credentials), 'transient' (4xx, throttling,
+    dropped connections, timeouts) or 'permanent' (5xx: the recipient will never accept it).
+    """
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return 'auth'
+    code = smtp_error_code(error)
+    if code in AUTH_FAILURE_CODES:
+        return 'auth'
+    if code is not None and code >= 500:
+        return 'permanent'
+    return 'transient'
+
+
+def describe_smtp_error(error):
+    """Short human-readable reason for the campaign log, e.g. 'SMTP error 451: Try again later'."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        code, text = error.smtp_code, error.smtp_error
+    elif isinstance(error, smtplib.SMTPRecipientsRefused) and error.recipients:
+        code, text = next(iter(error.recipients.values()))
+    else:
+        return f"SMTP error: {error}"
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', 'replace')
+    return f"SMTP error {code}: {str(text).strip()}"
+
+
+class TokenBucket:
+    """Allows up to `capacity` events per `period` seconds, refilling continuously."""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def give_back(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def used(self):
+        self._refill()
+        return self.capacity - self.tokens
+
+    def restore_used(self, used, elapsed):
+        """Starts from `used` events recorded `elapsed` seconds ago instead of a full bucket."""
+        self.tokens = min(self.capacity, self.capacity - used + elapsed * self.rate)
+        self.updated = time.monotonic()
+
+
+class AccountRateLimiter:
+    """
+    Per-account send pacing. Each SMTP account gets optional hourly/daily token buckets
+    (from 'hourly_limit' / 'daily_limit' in smtp_list.json) plus a minimum gap between sends.
+    Throttling replies slow down or pause only the account that received them.
+    Accounts never wait on each other. snapshot()/restore() carry the buckets' used counts across
+    restarts, so restarting the app does not hand out a fresh daily cap.
+    """
+
+    def __init__(self, jitter=True, backoff_pause=60, max_slowdown=8, recovery=0.8):
+        self.jitter = jitter
+        self.backoff_pause = backoff_pause
+        self.max_slowdown = max_slowdown
+        self.recovery = recovery
+        self._accounts = {}
+        self._restored = {}  # account email -> saved bucket usage, applied when its buckets are created
+        self._guard = threading.Lock()
+
+    def _state(self, smtp):
+        limits = (smtp.get('hourly_limit') or 0, smtp.get('daily_limit') or 0)
+        with self._guard:
+            state = self._accounts.get(smtp['email'])
+            if state is None:
+                state = {'limits': None, 'buckets': [], 'next_send': 0, 'slowdown': 1.0,
+                         'paused_until': 0, 'disabled': None, 'lock': threading.Lock()}
+                self._accounts[smtp['email']] = state
+            if state['limits'] != limits:
+                buckets = []
+                if limits[0]:
+                    buckets.append(TokenBucket(limits[0], 3600))
+                if limits[1]:
+                    buckets.append(TokenBucket(limits[1], 86400))
+                saved = self._restored.pop(smtp['email'], None)
+                if saved:
+                    elapsed = max(0, time.time() - saved.get('saved_at', 0))
+                    for bucket in buckets:
+                        used = saved.get('used', {}).get(str(bucket.period))
+                        if used is not None:
+                            bucket.restore_used(used, elapsed)
+                state['limits'] = limits
+                state['buckets'] = buckets
+            return state
+
+    def snapshot(self):
+        """{account email: {'saved_at', 'used': {period: count}}} for the accounts with hourly/daily caps."""
+        now = time.time()
+        with self._guard:
+            accounts = list(self._accounts.items())
+            snapshot = dict(self._restored)  # Accounts not used since the last restart
+        for account_email, state in accounts:
+            with state['lock']:
+                used = {str(bucket.period): round(bucket.used(), 3) for bucket in state['buckets']}
+            if used:
+                snapshot[account_email] = {'saved_at': now, 'used': used}
+        return snapshot
+
+    def restore(self, snapshot):
+        """Loads usage saved by snapshot(); call before the accounts send anything."""
+        with self._guard:
+            self._restored = {account_email: saved for account_email, saved in snapshot.items() if isinstance(saved, dict)}
+
+    def try_acquire(self, smtp):
+        """Takes a send slot and returns 0, or returns how many seconds to wait before trying again."""
+        state = self._state(smtp)
+        with state['lock']:
+            now = time.time()
+            wait = max([state['next_send'] - now, state['paused_until'] - now] + [bucket.wait_time() for bucket in state['buckets']])
+            if wait > 0:
+                return wait
+            for bucket in state['buckets']:
+                bucket.take()
+            return 0
+
+    def acquire(self, smtp, should_continue):
+        """Blocks until the account may send. Returns False if should_continue() turns false first."""
+        while should_continue():
+            wait = self.try_acquire(smtp)
+            if wait <= 0:
+                return True
+            time.sleep(min(wait, 1))
+        return False
+
+    def refund(self, smtp):
+        """Returns a slot taken for a message that was not sent after all."""
+        state = self._state(smtp)
+        with state['lock']:
+            for bucket in state['buckets']:
+                bucket.give_back()
+
+    def record_send(self, smtp, delay_range):
+        """Schedules the account's next send after a message actually went out."""
+        delay_min, delay_max = delay_range
+        delay = random.uniform(delay_min, delay_max) if self.jitter else delay_min
+        state = self._state(smtp)
+        with state['lock']:
+            state['next_send'] = time.time() + delay * state['slowdown']
+
+    def record_success(self, smtp):
+        """Ramps a slowed-down account back towards its normal pace."""
+        state = self._state(smtp)
+        with state['lock']:
+            state['slowdown'] = max(1.0, state['slowdown'] * self.recovery)
+
+    def penalize(self, smtp, reason):
+        """Reacts to a throttling signal: doubles the account's delays and pauses it for a while."""
+        state = self._state(smtp)
+        with state['lock']:
+            state['slowdown'] = min(self.max_slowdown, state['slowdown'] * 2)
+            pause = self.backoff_pause * state['slowdown']
+            state['paused_until'] = max(state['paused_until'], time.time() + pause)
+        print(f"[RATE LIMIT] {smtp['email']} throttled ({reason}). Pausing {int(pause)}s, delays x{state['slowdown']:.1f}.")
+
+    def disable(self, smtp, reason):
+        state = self._state(smtp)
+        with state['lock']:
+            state['disabled'] = reason
+        print(f"[RATE LIMIT] {smtp['email']} disabled: {reason}")
+
+    def is_disabled(self, smtp):
+        return bool(self._state(smtp)['disabled'])
+
+    def reset(self, account_email=None):
+        """Clears backoff and disabled flags, for one account or all of them."""
+        with self._guard:
+            states = [self._accounts[account_email]] if account_email in self._accounts else (
+                [] if account_email else list(self._accounts.values()))
+        for state in states:
+            with state['lock']:
+                state['slowdown'] = 1.0
+                state['paused_until'] = 0
+                state['disabled'] = None
+
+    def describe(self):
+        """Short summary of accounts that are not running at full speed, for the status bar."""
+        now = time.time()
+        parts = []
+        with self._guard:
+            accounts = list(self._accounts.items())
+        for account_email, state in accounts:
+            if state['disabled']:
+                parts.append(f"{account_email}: disabled")
+            elif state['paused_until'] > now:
+                parts.append(f"{account_email}: paused {int(state['paused_until'] - now)}s")
+            elif state['slowdown'] > 1:
+                parts.append(f"{account_email}: slowed x{state['slowdown']:.1f}")
+        return ", ".join(parts)
+
+
+def find_replies(imap_session, message_ids, since=None, min_uid=None, batch_size=500, deadline=None):
+    """
+    Returns ({message_id: reply_uid}, highest_uid, report_uids) for messages in the selected mailbox
+    whose In-Reply-To or References header points at one of `message_ids`. Uses one UID SEARCH and
+    header-only FETCHes in batches, so the matching happens locally instead of as one server-side
+    search per sent email. With min_uid only messages from that UID onwards are looked at.
+    Bounce reports (multipart/report) are not counted as replies; their UIDs are returned instead.
+    Raises TimeoutError once time.monotonic() passes `deadline`.
+    """
+    if min_uid:
+        criteria = f'UID {min_uid}:*'
+    else:
+        criteria = f'SINCE {since.strftime("%d-%b-%Y")}' if since else 'ALL'
+    status, data = imap_session.uid('SEARCH', None, criteria)
+    if status != 'OK' or not data or not data[0]:
+        return {}, 0, []
+
+    # "UID n:*" always matches the newest message, even when its UID is below n
+    uids = [uid for uid in data[0].split() if int(uid) >= (min_uid or 0)]
+    replies = {}
+    report_uids = []
+    for i in range(0, len(uids), batch_size):
+        if deadline and time.monotonic() > deadline:
+            raise TimeoutError(f"gave up after checking {i} of {len(uids)} messages")
+        uid_set = b','.join(uids[i:i + batch_size]).decode()
+        status, data = imap_session.uid('FETCH', uid_set, '(BODY.PEEK[HEADER.FIELDS (IN-REPLY-TO REFERENCES CONTENT-TYPE)])')
+        if status != 'OK':
+            # Skipping the batch would still count its UIDs as scanned, so its replies would never be seen
+            raise imaplib.IMAP4.error(f"FETCH of {len(uids[i:i + batch_size])} messages failed: {data}")
+        for item in data:
+            if not isinstance(item, tuple):
+                continue
+            uid_match = IMAP_UID_PATTERN.search(item[0])
+            reply_uid = uid_match.group(1).decode() if uid_match else None
+            if DSN_CONTENT_TYPE_PATTERN.search(item[1]):
+                if reply_uid:
+                    report_uids.append(reply_uid)
+                continue
+            for reference in MESSAGE_ID_PATTERN.findall(item[1]):
+                reference = reference.decode('ascii', errors='ignore')
+                if reference in message_ids and reference not in replies:
+                    replies[reference] = reply_uid
+    return replies, max((int(uid) for uid in uids), default=0), report_uids
+
+
+def parse_dsn(raw_message):
+    """
+    Reads a delivery status notification (RFC 3464) and returns one dict per recipient with
+    'recipient', 'action', 'status', 'diagnostic' and the 'original_message_id' it reports on.
+    """
+    report = email.message_from_bytes(raw_message)
+    if report.get_content_type() != 'multipart/report':
+        return []
+
+    results = []
+    original_message_id = None
+    for part in report.walk():
+        content_type = part.get_content_type()
+        if content_type == 'message/delivery-status':
+            blocks = part.get_payload()
+            for block in blocks if isinstance(blocks, list) else []:
+                recipient = block.get('Final-Recipient') or block.get('Original-Recipient')
+                if not recipient:
+                    continue  # The per-message block (Reporting-MTA etc.)
+                results.append({
+                    'recipient': normalize_email(recipient.split(';', 1)[-1].strip().strip('<>')),
+                    'action': (block.get('Action') or '').strip().lower(),
+                    'status': (block.get('Status') or '').strip(),
+                    'diagnostic': " ".join((block.get('Diagnostic-Code') or '').split(';', 1)[-1].split())
+                })
+        elif content_type in ('message/rfc822', 'text/rfc822-headers') and original_message_id is None:
+            if content_type == 'message/rfc822':
+                payload = part.get_payload()
+                original = payload[0] if isinstance(payload, list) and payload else None
+            else:
+                original = email.message_from_bytes(part.get_payload(decode=True) or b'')
+            if original is not None and original.get('Message-ID'):
+                original_message_id = original.get('Message-ID').strip()
+
+    for result in results:
+        result['original_message_id'] = original_message_id
+    return results
+
+
+def fetch_bounces(imap_session, uids, batch_size=50):
+    """Downloads the given bounce reports in batches and returns their parsed recipient results."""
+    bounces = []
+    for i in range(0, len(uids), batch_size):
+        status, data = imap_session.uid('FETCH', ",".join(uids[i:i + batch_size]), '(BODY.PEEK[])')
+        if status != 'OK':
+            continue
+        for item in data:
+            if isinstance(item, tuple):
+                try:
+                    bounces.extend(parse_dsn(item[1]))
+                except Exception as e:
+                    print(f"[BOUNCES] Could not parse a delivery report: {e}")
+    return bounces
+
+
+def imap_status_value(imap_session, key):
+    """Reads a number such as UIDVALIDITY or UIDNEXT from the last SELECT response."""
+    # Read without consuming it, so a pooled session selected earlier still has it.
+    # A stale UIDNEXT is still a safe lower bound for the next new message.
+    data = imap_session.untagged_responses.get(key)
+    try:
+        return int(data[-1])
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def open_imap_session(account, timeout=30):
+    """
+    Logs in to the account's IMAP server. Accounts may set 'imap_port' and 'imap_ssl'
+    (default 993 over SSL) in smtp_list.json, e.g. to reach a plain local test server.
+    """
+    use_ssl = account.get('imap_ssl', True)
+    port = account.get('imap_port') or (993 if use_ssl else 143)
+    if use_ssl:
+        imap = imaplib.IMAP4_SSL(account['imap_server'], port, timeout=timeout)
+    else:
+        imap = imaplib.IMAP4(account['imap_server'], port, timeout=timeout)
+    imap.login(account['email'], account['password'])
+    return imap
+
+
+class IMAPConnectionPool:
+    """
+    Shares logged-in IMAP sessions, with the inbox already selected, between follow-ups and the
+    reply checker. At most `max_per_account` sessions per account exist at a time; callers wait
+    for a free one. Sessions idle for `noop_after` seconds are probed with NOOP before reuse.
+    """
+
+    def __init__(self, max_per_account=2, noop_after=60, timeout=30):
+        self.max_per_account = max_per_account
+        self.noop_after = noop_after
+        self.timeout = timeout
+        self._idle = defaultdict(list)  # account email -> [{'imap', 'last_used'}]
+        self._in_use = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def _connect(self, account):
+        imap = open_imap_session(account, timeout=self.timeout)
+        imap.select('inbox')
+        return {'imap': imap, 'last_used': time.time()}
+
+    def _is_healthy(self, session):
+        if time.time() - session['last_used'] < self.noop_after:
+            return True
+        try:
+            status, _ = session['imap'].noop()
+            return status == 'OK'
+        except (imaplib.IMAP4.error, OSError):
+            return False
+
+    @staticmethod
+    def _logout(session):
+        try:
+            session['imap'].logout()
+        except Exception:
+            pass
+
+    @contextlib.contextmanager
+    def session(self, account):
+        """Checks out a session for the account; it is returned to the pool afterwards, or dropped on error."""
+        account_email = account['email']
+        with self._cond:
+            while not self._idle[account_email] and self._in_use[account_email] >= self.max_per_account:
+                self._cond.wait()
+            session = self._idle[account_email].pop() if self._idle[account_email] else None
+            self._in_use[account_email] += 1
+
+        try:
+            if session and not self._is_healthy(session):
+                self._logout(session)
+                session = None
+            if session is None:
+                session = self._connect(account)
+            yield session['imap']
+        except BaseException:
+            if session:
+                self._logout(session)
+            with self._cond:
+                self._in_use[account_email] -= 1
+                self._cond.notify_all()
+            raise
+
+        session['last_used'] = time.time()
+        with self._cond:
+            self._in_use[account_email] -= 1
+            self._idle[account_email].append(session)
+            self._cond.notify_all()
+
+    def close(self, account_email):
+        with self._cond:
+            sessions, self._idle[account_email] = self._idle[account_email], []
+        for session in sessions:
+            self._logout(session)
+
+    def close_idle(self, max_idle):
+        """Logs out sessions that have not been used for max_idle seconds."""
+        now = time.time()
+        expired = []
+        with self._cond:
+            for account_email, sessions in self._idle.items():
+                expired.extend(session for session in sessions if now - session['last_used'] >= max_idle)
+                sessions[:] = [session for session in sessions if now - session['last_used'] < max_idle]
+        for session in expired:
+            self._logout(session)
+
+    def close_all(self):
+        for account_email in list(self._idle.keys()):
+            self.close(account_email)
+
+
+class IMAPIdleWatcher:
+    """
+    Keeps one IMAP connection per account in IDLE on the inbox and calls on_new_mail(email)
+    as soon as the server reports new messages (an untagged EXISTS). IDLE is renewed every
+    `renew_after` seconds, before servers drop it. If the server lacks the IDLE capability the
+    watcher stops and sets `supported` to False so the account can be polled instead.
+    """
+
+    def __init__(self, account, on_new_mail, renew_after=1500, reconnect_delay=30):
+        self.account = dict(account)
+        self.email = account['email']
+        self.on_new_mail = on_new_mail
+        self.renew_after = renew_after
+        self.reconnect_delay = reconnect_delay
+        self.supported = None
+        # Our own tags for IDLE; "W" never appears in imaplib's (letters A-P), so they cannot clash
+        self._tags = itertools.count(1)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            imap = None
+            try:
+                imap = open_imap_session(self.account)
+                imap.select('inbox')
+                if 'IDLE' not in imap.capabilities:
+                    print(f"[IMAP IDLE] {self.email} does not support IDLE; it will be polled instead.")
+                    self.supported = False
+                    return
+                self.supported = True
+                # Catch up on anything that arrived while we were not connected
+                self.on_new_mail(self.email)
+                while not self._stop.is_set():
+                    if self._idle(imap):
+                        self.on_new_mail(self.email)
+            except Exception as e:
+                print(f"[IMAP IDLE] Connection for {self.email} failed: {e}. Reconnecting in {self.reconnect_delay}s.")
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if imap:
+                    try:
+                        imap.logout()
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def _has_buffered_data(imap):
+        """
+        True if imaplib's buffered reader already holds unread bytes, e.g. an EXISTS that came in
+        the same packet as "+ idling". select() on the socket cannot see those. The socket is made
+        non-blocking for the peek, so an empty buffer returns at once instead of waiting for data.
+        """
+        sock = imap.socket()
+        timeout = sock.gettimeout()
+        sock.setblocking(False)
+        try:
+            return bool(imap.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            sock.settimeout(timeout)
+
+    def _wait_readable(self, imap, timeout):
+        if self._has_buffered_data(imap):
+            return True
+        return bool(select.select([imap.socket()], [], [], timeout)[0])
+
+    def _read_line(self, imap):
+        line = imap.readline()
+        if not line or line.startswith(b'* BYE'):
+            raise imaplib.IMAP4.abort("server closed the IDLE connection")
+        return line
+
+    def _idle(self, imap):
+        """Runs one IDLE command until new mail arrives, the renew time passes or the watcher stops."""
+        tag = b'W%d' % next(self._tags)
+        imap.send(tag + b' IDLE\r\n')
+        line = self._read_line(imap)
+        if not line.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"IDLE rejected: {line.strip()!r}")
+
+        new_mail = False
+        deadline = time.monotonic() + self.renew_after
+        while not new_mail and not self._stop.is_set() and time.monotonic() < deadline:
+            # Short waits so stop() is noticed quickly
+            if self._wait_readable(imap, min(1, max(0, deadline - time.monotonic()))):
+                new_mail = self._read_line(imap).rstrip().upper().endswith(b'EXISTS')
+
+        imap.send(b'DONE\r\n')
+        while True:
+            line = self._read_line(imap)
+            if line.rstrip().upper().endswith(b'EXISTS'):
+                new_mail = True
+            if line.startswith(tag):
+                return new_mail
+
+
+def new_recipient_report():
+    return {'read': 0, 'kept': 0, 'dropped': Counter(), 'domains': Counter()}
+
+
+def normalize_email(address):
+    """The form addresses are compared in: recipients, DNC keys and log lookups all go through this."""
+    return address.strip().lower()
+
+
+def clean_recipients(addresses, report):
+    """
+    Normalizes a chunk of raw addresses (strip + lower-case) and drops empty and malformed ones,
+    counting them into `report`. Duplicates are left to dedupe_recipients.
+    """
+    cleaned = []
+    dropped = report['dropped']
+    is_valid = EMAIL_PATTERN.fullmatch
+    for address in addresses:
+        address = normalize_email(address)
+        if not address:
+            dropped['empty'] += 1
+        elif not is_valid(address):
+            dropped['invalid'] += 1
+        else:
+            cleaned.append(address)
+    report['read'] += len(addresses)
+    return cleaned
+
+
+def dedupe_recipients(items, seen, report, skip=()):
+    """
+    Yields the (position, address) pairs whose address is new to `seen` and not in `skip`, and
+    counts the survivors per destination domain into `report`.
+    """
+    dropped = report['dropped']
+    domains = report['domains']
+    for position, address in items:
+        if address in seen:
+            dropped['duplicate'] += 1
+            continue
+        seen.add(address)
+        if address in skip:
+            dropped['already handled'] += 1
+            continue
+        report['kept'] += 1
+        domains[address.rpartition('@')[2]] += 1
+        yield position, address
+
+
+def format_recipient_report(report, top_domains=5):
+    dropped = ", ".join(f"{count} {reason}" for reason, count in report['dropped'].most_common()) or "none"
+    domains = ", ".join(f"{domain} ({count})" for domain, count in report['domains'].most_common(top_domains))
+    return (f"Read {report['read']} rows, kept {report['kept']} recipients across {len(report['domains'])} domains. "
+            f"Dropped: {dropped}. Top domains: {domains or 'none'}")
+
+
+class RecipientStream:
+    """
+    Reads recipients lazily from a CSV (with an 'email' column) or TXT file, one chunk at a time.
+    Addresses go through clean_recipients and dedupe_recipients, and the report of the last full
+    pass is kept in `report`. Files that may hold more than `partition_size` addresses are spread
+    over temporary partition files by address hash: every copy of an address lands in the same
+    partition, so duplicates are caught (and partitions shuffled) one partition at a time and
+    memory use stays bounded by the partition size.
+    Recipients in `skip` are left out (used when resuming a campaign).
+    """
+
+    def __init__(self, path, shuffle=True, chunk_size=10000, partition_size=100000, skip=None):
+        self.path = path
+        self.shuffle = shuffle
+        self.chunk_size = chunk_size
+        self.partition_size = partition_size
+        self.skip = {normalize_email(address) for address in skip or ()}
+        self.report = None
+        self._count = None
+        self._rows = None
+
+    def _iter_raw_chunks(self):
+        if self.path.lower().endswith(".csv"):
+            with open(self.path, newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, [])
+                email_column = next((i for i, name in enumerate(header) if name.strip().lower() == 'email'), None)
+                if email_column is None:
+                    raise ValueError("CSV file must contain an 'email' column.")
+                while True:
+                    rows = list(itertools.islice(reader, self.chunk_size))
+                    if not rows:
+                        break
+                    yield [row[email_column] if len(row) > email_column else '' for row in rows]
+        else:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                while True:
+                    lines = list(itertools.islice(f, self.chunk_size))
+                    if not lines:
+                        break
+                    yield lines
+
+    def _iter_cleaned(self, report):
+        """Yields (position in the file, address) for every valid address, duplicates included."""
+        position = 0
+        for raw_chunk in self._wrap_read_errors(self._iter_raw_chunks()):
+            for address in clean_recipients(raw_chunk, report):
+                yield position, address
+                position += 1
+
+    def _wrap_read_errors(self, raw_chunks):
+        try:
+            yield from raw_chunks
+        except UnicodeDecodeError:
+            raise ValueError(f"Could not read file '{self.path}'. Please ensure it's a valid UTF-8 or plain text file.")
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error reading recipients file '{self.path}': {e}")
+
+    def _partition_count(self):
+        # Sized on the raw row count, which only takes a read of the file and no memory
+        if self._rows is None:
+            self._rows = sum(len(raw_chunk) for raw_chunk in self._wrap_read_errors(self._iter_raw_chunks()))
+        return max(1, -(-self._rows // self.partition_size))
+
+    def _iter_partitions(self, report, shuffled=False):
+        """
+        Yields the kept (position, address) pairs of one hash partition at a time, each in file order
+        (the partitions themselves in random order with shuffled=True). Small files are a single partition.
+        """
+        partitions = self._partition_count()
+        if partitions == 1:
+            yield list(dedupe_recipients(self._iter_cleaned(report), set(), report, self.skip))
+            return
+
+        with tempfile.TemporaryDirectory(prefix="recipients-") as temp_dir:
+            paths = [os.path.join(temp_dir, f"part-{i}.txt") for i in range(partitions)]
+            files = [open(path, 'w', encoding='utf-8') for path in paths]
+            try:
+                for position, address in self._iter_cleaned(report):
+                    files[zlib.crc32(address.encode('utf-8')) % partitions].write(f"{position} {address}\n")
+            finally:
+                for f in files:
+                    f.close()
+
+            if shuffled:
+                random.shuffle(paths)
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    items = [(int(position), address) for position, address in (line.split() for line in f)]
+                yield list(dedupe_recipients(items, set(), report, self.skip))
+
+    def _batched(self, addresses):
+        while True:
+            chunk = list(itertools.islice(addresses, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def iter_chunks(self):
+        """Yields lists of up to chunk_size cleaned addresses, in file order."""
+        report = new_recipient_report()
+        if self._partition_count() == 1:
+            yield from self._batched(address for _, address in dedupe_recipients(self._iter_cleaned(report), set(), report, self.skip))
+        else:
+            # The deduplicated partitions are each in file order, so merging them restores it
+            with tempfile.TemporaryDirectory(prefix="recipients-") as temp_dir:
+                paths = []
+                for i, items in enumerate(self._iter_partitions(report)):
+                    paths.append(os.path.join(temp_dir, f"kept-{i}.txt"))
+                    with open(paths[-1], 'w', encoding='utf-8') as f:
+                        f.writelines(f"{position} {address}\n" for position, address in items)
+                files = [open(path, 'r', encoding='utf-8') for path in paths]
+                try:
+                    merged = heapq.merge(*(((int(position), address) for position, address in map(str.split, f)) for f in files))
+                    yield from self._batched(address for _, address in merged)
+                finally:
+                    for f in files:
+                        f.close()
+        self.report = report
+        self._count = report['kept']
+
+    def count(self):
+        if self._count is None:
+            report = new_recipient_report()
+            for _ in self._iter_partitions(report):
+                pass
+            self.report = report
+            self._count = report['kept']
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        # Stops at the first address that would be sent instead of reading the whole file
+        return any(address not in self.skip for _, address in self._iter_cleaned(new_recipient_report()))
+
+    def __iter__(self):
+        if not self.shuffle:
+            for chunk in self.iter_chunks():
+                yield from chunk
+            return
+        yield from self._iter_shuffled()
+
+    def _iter_shuffled(self):
+        report = new_recipient_report()
+        for items in self._iter_partitions(report, shuffled=True):
+            recipients = [address for _, address in items]
+            random.shuffle(recipients)
+            yield from recipients
+        self.report = report
+        self._count = report['kept']
+
+
+class AsyncSMTPClient:
+    """Minimal non-blocking SMTP client (EHLO, STARTTLS, AUTH PLAIN, MAIL/RCPT/DATA) over asyncio streams."""
+
+    def __init__(self, host, port, timeout=10, use_starttls=True):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.use_starttls = use_starttls
+        self.reader = None
+        self.writer = None
+        self.messages = 0
+        self.last_used = time.time()
+
+    async def _read_reply(self):
+        lines = []
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not line:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            line = line.decode('utf-8', 'replace').rstrip('\r\n')
+            lines.append(line[4:])
+            if line[3:4] != '-':
+                return int(line[:3]), "\n".join(lines)
+
+    async def _command(self, line, expected=(250,)):
+        self.writer.write(f"{line}\r\n".encode('utf-8'))
+        await self.writer.drain()
+        code, text = await self._read_reply()
+        if code not in expected:
+            raise smtplib.SMTPResponseException(code, text)
+        return code, text
+
+    async def _start_tls(self):
+        context = ssl.create_default_context()
+        if hasattr(self.writer, 'start_tls'):  # Python 3.11+
+            await self.writer.start_tls(context, server_hostname=self.host)
+        else:
+            loop = asyncio.get_running_loop()
+            protocol = self.writer.transport.get_protocol()
+            transport = await loop.start_tls(self.writer.transport, protocol, context, server_hostname=self.host)
+            self.writer = asyncio.StreamWriter(transport, protocol, self.reader, loop)
+
+    async def connect(self, smtp):
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        code, text = await self._read_reply()
+        if code != 220:
+            raise smtplib.SMTPConnectError(code, text)
+        local_name = socket.getfqdn()
+        await self._command(f"EHLO {local_name}")
+        if self.use_starttls:
+            await self._command("STARTTLS", (220,))
+            await self._start_tls()
+            await self._command(f"EHLO {local_name}")
+        credentials = base64.b64encode(f"\0{smtp['email']}\0{smtp['password']}".encode('utf-8')).decode('ascii')
+        try:
+            await self._command(f"AUTH PLAIN {credentials}", (235,))
+        except smtplib.SMTPResponseException as e:
+            raise smtplib.SMTPAuthenticationError(e.smtp_code, e.smtp_error)
+        self.last_used = time.time()
+
+    async def is_healthy(self, noop_after):
+        """Connections that sat idle are probed with NOOP before being reused, as SMTPConnectionPool does."""
+        if time.time() - self.last_used < noop_after:
+            return True
+        try:
+            await self._command("NOOP")
+            return True
+        except (smtplib.SMTPException, OSError, asyncio.TimeoutError):
+            return False
+
+    async def sendmail(self, from_addr, to_addr, msg_string):
+        try:
+            await self._command(f"MAIL FROM:<{from_addr}>")
+            await self._command(f"RCPT TO:<{to_addr}>", (250, 251))
+            await self._command("DATA", (354,))
+            data = smtplib.quotedata(msg_string)
+            if not data.endswith("\r\n"):
+                data += "\r\n"
+            self.writer.write(data.encode('utf-8') + b".\r\n")
+            await self.writer.drain()
+            code, text = await self._read_reply()
+            if code != 250:
+                raise smtplib.SMTPDataError(code, text)
+        except smtplib.SMTPResponseException:
+            # Ends the refused transaction so the next MAIL FROM on this connection is not nested (as smtplib does)
+            await self._rset()
+            raise
+        self.messages += 1
+        self.last_used = time.time()
+
+    async def _rset(self):
+        """Sends RSET; a connection that cannot take it is closed so it is not reused."""
+        try:
+            await self._command("RSET")
+        except (smtplib.SMTPException, OSError, asyncio.TimeoutError):
+            self.close()
+
+    async def quit(self):
+        try:
+            await self._command("QUIT", (221,))
+        except Exception:
+            pass
+        self.close()
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+# ------------------------- Campaign Log Storage ------------------------ #
+def write_file_atomically(path, payload):
+    """Writes text to a temporary file next to `path`, fsyncs it and renames it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Makes the rename itself durable (POSIX only)
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class WriteBehindWriter:
+    """
+    Background thread that performs file writes for the other threads. write() only records the
+    newest content of a file; the thread flushes every dirty file once `flush_every` updates have
+    piled up or `interval` seconds after the first one, so several updates to a file cost one
+    write. Each write goes through write_file_atomically, and on_written callbacks run after it.
+    A failed write is retried on the next flushes; after `max_attempts` failures in a row the
+    content is dropped and on_error(path, exception) is called from the writer thread.
+    """
+
+    def __init__(self, interval=1.0, flush_every=100, max_attempts=3, on_error=None):
+        self.interval = interval
+        self.flush_every = flush_every
+        self.max_attempts = max_attempts
+        self.on_error = on_error
+        self._dirty = {}      # path -> (payload, [on_written callbacks])
+        self._in_flight = {}  # the batch being written right now
+        self._failures = {}   # path -> failed attempts in a row
+        self._updates = 0
+        self._flush_requested = False
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._stats = {'flushes': 0, 'files_written': 0, 'updates': 0, 'errors': 0, 'dropped': 0,
+                       'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'total_flush_ms': 0.0, 'peak_queue_depth': 0}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, path, payload, on_written=None):
+        with self._cond:
+            previous = self._dirty.get(path)
+            callbacks = previous[1] if previous else []
+            if on_written:
+                callbacks.append(on_written)
+            self._dirty[path] = (payload, callbacks)
+            self._updates += 1
+            self._stats['updates'] += 1
+            self._stats['peak_queue_depth'] = max(self._stats['peak_queue_depth'], self._updates)
+            self._cond.notify_all()
+
+    def pending(self, path):
+        """The content waiting to be written to `path`, or None if the file on disk is current."""
+        with self._cond:
+            entry = self._dirty.get(path) or self._in_flight.get(path)
+            return entry[0] if entry else None
+
+    def pending_paths(self):
+        with self._cond:
+            return set(self._dirty) | set(self._in_flight)
+
+    def discard(self, path):
+        """
+        Drops a pending write (e.g. before deleting the file), waiting out one already in progress.
+        Returns True if a queued write was dropped.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: path not in self._in_flight)
+            discarded = self._dirty.pop(path, None) is not None
+            if not self._dirty:
+                self._updates = 0
+            return discarded
+
+    def flush(self, timeout=None):
+        """Writes everything pending now and waits until it is on disk. Returns False on timeout."""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._dirty and not self._in_flight, timeout)
+
+    def stop(self, timeout=None):
+        """Flushes (see flush) and ends the thread. Returns False if writes were still pending after `timeout`."""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        return flushed
+
+    def stats(self):
+        """Queue depth (updates not yet written) and flush latency figures in milliseconds."""
+        with self._cond:
+            stats = dict(self._stats, queue_depth=self._updates, dirty_files=len(self._dirty))
+        stats['avg_flush_ms'] = stats['total_flush_ms'] / stats['flushes'] if stats['flushes'] else 0.0
+        return stats
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._dirty or self._stopped)
+                if self._stopped and not self._dirty:
+                    return
+                # Let more updates pile up, unless enough are waiting or someone needs them on disk now
+                self._cond.wait_for(lambda: self._stopped or self._flush_requested or self._updates >= self.flush_every,
+                                    self.interval)
+                batch, self._dirty = self._dirty, {}
+                self._in_flight = batch
+                self._updates = 0
+                self._flush_requested = False
+
+            started = time.perf_counter()
+            failed = {}
+            for path, (payload, callbacks) in batch.items():
+                try:
+                    write_file_atomically(path, payload)
+                    for callback in callbacks:
+                        callback()
+                except Exception as e:
+                    print(f"[WRITER] Could not write {path}: {e}")
+                    failed[path] = (payload, callbacks, e)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            given_up = []
+            with self._cond:
+                self._in_flight = {}
+                for path in batch:
+                    if path not in failed:
+                        self._failures.pop(path, None)
+                for path, (payload, callbacks, error) in failed.items():
+                    self._failures[path] = self._failures.get(path, 0) + 1
+                    if self._failures[path] < self.max_attempts:
+                        # Retried on the next flush unless newer content has arrived meanwhile
+                        self._dirty.setdefault(path, (payload, callbacks))
+                    elif path not in self._dirty:
+                        del self._failures[path]
+                        given_up.append((path, error))
+                    else:
+                        # Newer content gets one last attempt of its own before it is dropped too
+                        self._failures[path] = self.max_attempts - 1
+                self._stats['flushes'] += 1
+                self._stats['files_written'] += len(batch) - len(failed)
+                self._stats['errors'] += len(failed)
+                self._stats['dropped'] += len(given_up)
+                self._stats['last_flush_ms'] = elapsed_ms
+                self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed_ms)
+                self._stats['total_flush_ms'] += elapsed_ms
+                self._cond.notify_all()
+            for path, error in given_up:
+                print(f"[WRITER] Giving up on {path} after {self.max_attempts} failed attempts.")
+                if self.on_error:
+                    self.on_error(path, error)
+            if len(failed) > len(given_up):
+                time.sleep(self.interval)
+
+
+_UNSET = object()
+
+
+class EmailLogEntry(MutableMapping):
+    """
+    One recipient's row in a campaign log. Behaves like the dict it replaces, but keeps the known
+    fields in slots instead of a per-row hash table and shares the strings that repeat on every
+    row (subject, account, template, statuses). Keys outside FIELDS go in a small overflow dict.
+    """
+    # In the order they are written to the log files
+    FIELDS = ('recipient', 'smtp_used', 'subject', 'body_template_name', 'status', 'reason', 'timestamp', 'message_id',
+              'followup_status', 'followup_count', 'flag_no_followup', 'last_followup_message_id', 'last_followup_at')
+    SHARED_FIELDS = frozenset({'smtp_used', 'subject', 'body_template_name', 'status', 'reason', 'followup_status'})
+    _FIELD_SET = frozenset(FIELDS)
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, *args, **kwargs):
+        for field in self.FIELDS:
+            setattr(self, field, _UNSET)
+        self._extra = None
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            if key in self.SHARED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET and getattr(self, key) is not _UNSET:
+            setattr(self, key, _UNSET)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field) is not _UNSET:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for field in self.FIELDS if getattr(self, field) is not _UNSET) + len(self._extra or ())
+
+    # get and `in` run for every row in most scans; skip Mapping's KeyError round trip
+    def get(self, key, default=None):
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _UNSET else value
+        return self._extra.get(key, default) if self._extra else default
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key) is not _UNSET
+        return bool(self._extra) and key in self._extra
+
+    def copy(self):
+        return EmailLogEntry(self.to_dict())
+
+    def __reduce__(self):
+        # Pickle and copy.copy/deepcopy would otherwise store the slots, _UNSET included, and a
+        # restored _UNSET is a different object, so empty fields would read as set
+        return EmailLogEntry, (self.to_dict(),)
+
+    def to_dict(self):
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not _UNSET:
+                data[field] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __repr__(self):
+        return f"EmailLogEntry({self.to_dict()!r})"
+
+
+def encode_log_entry(obj):
+    """json `default` hook that writes EmailLogEntry rows as plain JSON objects."""
+    if isinstance(obj, EmailLogEntry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def awaiting_followup(entry):
+    """True for a sent email that is not flagged and has not been replied to."""
+    return entry.get('status') == 'sent' and not entry.get('flag_no_followup') and entry.get('followup_status') != 'Replied'
+
+
+def summarize_campaign_log(log_data, unreplied_count=None):
+    """
+    The campaign fields without the per-email rows, plus 'email_count' and 'unreplied_count'.
+    Counting unreplied emails walks every row, so callers that already know it can pass it in.
+    """
+    summary = {key: value for key, value in log_data.items() if key != 'emails'}
+    emails = log_data.get('emails', [])
+    summary['email_count'] = len(emails)
+    summary['unreplied_count'] = sum(1 for entry in emails if awaiting_followup(entry)) if unreplied_count is None else unreplied_count
+    return summary
+
+
+class JSONLogStore:
+    """
+    Default campaign log storage: one JSON summary file per campaign in `log_dir` plus an
+    append-only journal of the results written since the last compaction. JSON files have no
+    indexes, so lookups have to load and scan the campaign files.
+    Summary files are written through `writer` (a WriteBehindWriter) when one is given. On each
+    save the journal is set aside under a sequence number and only deleted once the new summary
+    is on disk; replaying a journal twice is harmless, so a crash at any point loses nothing.
+    """
+    indexed = False
+
+    def __init__(self, log_dir, writer=None):
+        self.log_dir = log_dir
+        self.writer = writer
+        # Serializes journal appends, loads and compactions per campaign log
+        self._locks = defaultdict(threading.Lock)
+
+    def _path(self, campaign_id):
+        return os.path.join(self.log_dir, campaign_id)
+
+    def _journal_path(self, campaign_id, sequence=None):
+        suffix = "journal.jsonl" if sequence is None else f"journal.{sequence}.jsonl"
+        return os.path.join(self.log_dir, f"{os.path.splitext(campaign_id)[0]}.{suffix}")
+
+    def _set_aside_journals(self, campaign_id):
+        """[(sequence, path)] of journals waiting for their summary file to be written, oldest first."""
+        prefix = f"{os.path.splitext(campaign_id)[0]}.journal."
+        journals = []
+        for file in os.listdir(self.log_dir):
+            sequence = file[len(prefix):-len(".jsonl")] if file.startswith(prefix) and file.endswith(".jsonl") else ""
+            if sequence.isdigit():
+                journals.append((int(sequence), os.path.join(self.log_dir, file)))
+        return sorted(journals)
+
+    def _write(self, path, payload, on_written=None):
+        if self.writer:
+            self.writer.write(path, payload, on_written)
+        else:
+            write_file_atomically(path, payload)
+            if on_written:
+                on_written()
+
+    def campaign_ids(self):
+        ids = {file for file in os.listdir(self.log_dir) if file.endswith(".json")}
+        if self.writer:
+            # New campaigns whose first write is still queued
+            log_dir = os.path.abspath(self.log_dir)
+            ids.update(os.path.basename(path) for path in self.writer.pending_paths()
+                       if os.path.dirname(os.path.abspath(path)) == log_dir and path.endswith(".json"))
+        return sorted(ids)
+
+    def modification_stamps(self):
+        """
+        {campaign id: stamp} that changes whenever the campaign's summary file or journals change
+        (modification times and sizes). Campaigns with a write still queued get None, which never matches.
+        """
+        files = defaultdict(list)
+        for file in os.listdir(self.log_dir):
+            if file.endswith(".json"):
+                campaign_id = file
+            elif ".journal." in file and file.endswith(".jsonl"):
+                campaign_id = f"{file.split('.journal.', 1)[0]}.json"
+            else:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.log_dir, file))
+            except FileNotFoundError:
+                continue
+            files[campaign_id].append(f"{file}:{stat.st_mtime_ns}:{stat.st_size}")
+        stamps = {campaign_id: "|".join(sorted(parts)) for campaign_id, parts in files.items() if campaign_id.endswith(".json")}
+        for campaign_id in self.campaign_ids():
+            if campaign_id not in stamps or (self.writer and self.writer.pending(self._path(campaign_id)) is not None):
+                stamps[campaign_id] = None
+        return {campaign_id: stamps[campaign_id] for campaign_id in self.campaign_ids()}
+
+    def load(self, campaign_id):
+        """Loads a campaign's summary (the queued version if a write is pending) and replays the journals written since."""
+        with self._locks[campaign_id]:
+            pending = self.writer.pending(self._path(campaign_id)) if self.writer else None
+            if pending is not None:
+                log_data = json.loads(pending)
+            else:
+                with open(self._path(campaign_id), 'r', encoding='utf-8') as f:
+                    log_data = json.load(f)
+            emails = log_data['emails'] = [EmailLogEntry(entry) for entry in log_data.get('emails', [])]
+
+            journal_paths = [path for _, path in self._set_aside_journals(campaign_id)] + [self._journal_path(campaign_id)]
+            entries_by_recipient = None
+            for journal_path in journal_paths:
+                try:
+                    f = open(journal_path, 'r', encoding='utf-8')
+                except FileNotFoundError:
+                    continue  # No journal, or one just folded into the summary we read
+                if entries_by_recipient is None:
+                    entries_by_recipient = {entry.get('recipient'): entry for entry in emails}
+                with f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            break  # A torn last line from a crash mid-write
+                        if record.get('op') == 'email':
+                            entry = record['entry']
+                            existing = entries_by_recipient.get(entry.get('recipient'))
+                            if existing is not None:
+                                existing.update(entry)
+                            else:
+                                entry = EmailLogEntry(entry)
+                                emails.append(entry)
+                                entries_by_recipient[entry.get('recipient')] = entry
+                        for key in ('total_sent', 'total_failed', 'total_bounced'):
+                            if key in record:
+                                log_data[key] = record[key]
+        return log_data
+
+    def load_all(self):
+        logs = {}
+        for campaign_id in self.campaign_ids():
+            try:
+                logs[campaign_id] = self.load(campaign_id)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"Error loading log file {campaign_id}: {e}")
+        return logs
+
+    def campaign_summaries(self):
+        """One summarize_campaign_log() dict per campaign; each file is parsed and its rows dropped right away."""
+        summaries = []
+        for campaign_id in self.campaign_ids():
+            try:
+                summaries.append(summarize_campaign_log(self.load(campaign_id)))
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"Error loading log file {campaign_id}: {e}")
+        return summaries
+
+    def append(self, campaign_id, record):
+        """Appends one record to the campaign's journal instead of rewriting the whole log."""
+        with self._locks[campaign_id]:
+            with open(self._journal_path(campaign_id), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, default=encode_log_entry) + "\n")
+
+    def save(self, log_data):
+        """Writes the full campaign log; the journals it now contains are deleted once it is on disk."""
+        campaign_id = log_data['id']
+        with self._locks[campaign_id]:
+            # Serialized under the lock, so every record journaled before this point is in the payload
+            payload = json.dumps(log_data, indent=2, default=encode_log_entry)
+            journal_path = self._journal_path(campaign_id)
+            set_aside = self._set_aside_journals(campaign_id)
+            if os.path.exists(journal_path):
+                sequence = set_aside[-1][0] + 1 if set_aside else 1
+                os.replace(journal_path, self._journal_path(campaign_id, sequence))
+                set_aside.append((sequence, self._journal_path(campaign_id, sequence)))
+            obsolete = [path for _, path in set_aside]
+            self._write(self._path(campaign_id), payload, lambda: self._remove_files(obsolete))
+
+    @staticmethod
+    def _remove_files(paths):
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def compact(self, log_data):
+        """Folds the journal back into the summary file."""
+        self.save(log_data)
+
+    def delete(self, campaign_id):
+        with self._locks[campaign_id]:
+            discarded = self.writer.discard(self._path(campaign_id)) if self.writer else False
+            try:
+                os.remove(self._path(campaign_id))
+            except FileNotFoundError:
+                if not discarded:  # A campaign that was only ever queued has no file yet
+                    raise
+            self._remove_files([self._journal_path(campaign_id)] + [path for _, path in self._set_aside_journals(campaign_id)])
+
+    def find_by_message_id(self, message_id):
+        """Returns (campaign_id, recipient) of the email or follow-up sent with this Message-ID, or None. Loads every log."""
+        for campaign_id, log_data in self.load_all().items():
+            for entry in log_data['emails']:
+                if message_id in (entry.get('message_id'), entry.get('last_followup_message_id')):
+                    return campaign_id, entry['recipient']
+        return None
+
+    def followup_candidates(self, log_data, due_before=None):
+        """
+        Recipients of a campaign that can get a follow-up: sent, not flagged and not replied,
+        and with due_before, last emailed (first send or latest follow-up) no later than that.
+        """
+        return [
+            entry['recipient'] for entry in log_data.get('emails', [])
+            if awaiting_followup(entry) and not (due_before and (entry.get('last_followup_at') or entry.get('timestamp', '')) > due_before)
+        ]
+
+    def flag_no_followup(self, recipients, flagged_logs):
+        """
+        Sets the no-follow-up flag for the recipients in every campaign. flagged_logs are loaded
+        logs the caller already flagged in memory; they are saved as they are (and counted as 0 below).
+        Returns {changed campaign id: how many of the flagged emails were awaiting a follow-up}.
+        """
+        recipients = {normalize_email(recipient) for recipient in recipients}
+        changed = dict.fromkeys(flagged_logs, 0)
+        for log_data in flagged_logs.values():
+            self.save(log_data)
+        for campaign_id in self.campaign_ids():
+            if campaign_id in flagged_logs:
+                continue
+            try:
+                log_data = self.load(campaign_id)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"Error loading log file {campaign_id}: {e}")
+                continue
+            entries = [entry for entry in log_data['emails']
+                       if normalize_email(entry.get('recipient', '')) in recipients and not entry.get('flag_no_followup')]
+            unreplied = sum(1 for entry in entries if awaiting_followup(entry))
+            for entry in entries:
+                entry['flag_no_followup'] = True
+            if entries:
+                self.save(log_data)
+                changed[campaign_id] = unreplied
+        return changed
+
+    def record_replies(self, replies):
+        pass  # The notifications file already keeps every detected reply
+
+
+class SQLiteLogStore:
+    """
+    Campaign logs in one embedded SQLite database. Sends, follow-ups and replies are tables
+    indexed on recipient, Message-ID, status and sending account, so lookups no longer scan every
+    campaign. WAL mode lets the UI and the reply checker read while campaign and follow-up threads
+    write; each thread uses its own connection.
+    """
+    indexed = True
+    CAMPAIGN_COLUMNS = ('name', 'timestamp_start', 'timestamp_end', 'recipients_file', 'total_sent', 'total_failed', 'total_bounced')
+    SEND_COLUMNS = ('smtp_used', 'subject', 'body_template_name', 'status', 'reason', 'timestamp', 'message_id', 'flag_no_followup')
+    FOLLOWUP_COLUMNS = ('followup_status', 'followup_count', 'last_followup_message_id', 'last_followup_at')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS campaigns (
+            id TEXT PRIMARY KEY, name TEXT, timestamp_start TEXT, timestamp_end TEXT, recipients_file TEXT,
+            total_sent INTEGER, total_failed INTEGER, total_bounced INTEGER, extra TEXT);
+        CREATE TABLE IF NOT EXISTS sends (
+            seq INTEGER PRIMARY KEY, campaign_id TEXT NOT NULL, recipient TEXT NOT NULL,
+            smtp_used TEXT, subject TEXT, body_template_name TEXT, status TEXT, reason TEXT, timestamp TEXT,
+            message_id TEXT, flag_no_followup INTEGER, extra TEXT, UNIQUE (campaign_id, recipient));
+        CREATE INDEX IF NOT EXISTS sends_recipient ON sends (recipient);
+        DROP INDEX IF EXISTS sends_recipient_lower;
+        CREATE INDEX IF NOT EXISTS sends_recipient_normalized ON sends (lower(trim(recipient, char(32, 9, 13, 10))));
+        CREATE INDEX IF NOT EXISTS sends_message_id ON sends (message_id);
+        CREATE INDEX IF NOT EXISTS sends_status ON sends (campaign_id, status);
+        CREATE INDEX IF NOT EXISTS sends_smtp_used ON sends (smtp_used, status);
+        CREATE TABLE IF NOT EXISTS followups (
+            campaign_id TEXT NOT NULL, recipient TEXT NOT NULL, followup_status TEXT, followup_count INTEGER,
+            last_followup_message_id TEXT, last_followup_at TEXT, PRIMARY KEY (campaign_id, recipient));
+        CREATE INDEX IF NOT EXISTS followups_message_id ON followups (last_followup_message_id);
+        CREATE INDEX IF NOT EXISTS followups_status ON followups (followup_status);
+        CREATE TABLE IF NOT EXISTS replies (
+            message_id TEXT PRIMARY KEY, campaign_id TEXT, recipient TEXT, detected_at TEXT);
+        CREATE INDEX IF NOT EXISTS replies_campaign ON replies (campaign_id);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS revisions (campaign_id TEXT PRIMARY KEY, revision INTEGER NOT NULL);
+    """
+    # SQLite's default limit on bound parameters per statement is 999
+    BATCH_SIZE = 500
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _extra(data, known):
+        extra = {key: value for key, value in data.items() if key not in known}
+        return json.dumps(extra) if extra else None
+
+    def _save_campaign_row(self, conn, log_data):
+        known = set(self.CAMPAIGN_COLUMNS) | {'id', 'emails'}
+        columns = ('id',) + self.CAMPAIGN_COLUMNS + ('extra',)
+        conn.execute(
+            f"INSERT INTO campaigns ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns[1:])}",
+            (log_data['id'], *(log_data.get(c) for c in self.CAMPAIGN_COLUMNS), self._extra(log_data, known)))
+
+    def _upsert_entries(self, conn, campaign_id, entries):
+        known = set(self.SEND_COLUMNS) | set(self.FOLLOWUP_COLUMNS) | {'recipient'}
+        send_columns = ('campaign_id', 'recipient') + self.SEND_COLUMNS + ('extra',)
+        followup_columns = ('campaign_id', 'recipient') + self.FOLLOWUP_COLUMNS
+        send_rows = []
+        followup_rows = []
+        for entry in entries:
+            send_rows.append((campaign_id, entry['recipient'], *(entry.get(c) for c in self.SEND_COLUMNS), self._extra(entry, known)))
+            if any(c in entry for c in self.FOLLOWUP_COLUMNS):
+                followup_rows.append((campaign_id, entry['recipient'], *(entry.get(c) for c in self.FOLLOWUP_COLUMNS)))
+        for table, columns, rows in (('sends', send_columns, send_rows), ('followups', followup_columns, followup_rows)):
+            if rows:
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT (campaign_id, recipient) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns[2:])}",
+                    rows)
+
+    @staticmethod
+    def _bump_revisions(conn, campaign_ids):
+        """Counts every change to a campaign's rows, for modification_stamps()."""
+        conn.executemany("INSERT INTO revisions (campaign_id, revision) VALUES (?, 1) "
+                         "ON CONFLICT (campaign_id) DO UPDATE SET revision = revision + 1",
+                         [(campaign_id,) for campaign_id in campaign_ids])
+
+    def modification_stamps(self):
+        """{campaign id: revision}; the revision goes up with every write to the campaign."""
+        rows = self._connection().execute(
+            "SELECT c.id, COALESCE(r.revision, 0) AS revision FROM campaigns c LEFT JOIN revisions r ON r.campaign_id = c.id")
+        return {row['id']: row['revision'] for row in rows}
+
+    def _entry_from_row(self, row):
+        entry = EmailLogEntry(recipient=row['recipient'])
+        for column in self.SEND_COLUMNS + self.FOLLOWUP_COLUMNS:
+            if row[column] is not None:
+                entry[column] = row[column]
+        if 'flag_no_followup' in entry:
+            entry['flag_no_followup'] = bool(entry['flag_no_followup'])
+        if row['extra']:
+            entry.update(json.loads(row['extra']))
+        return entry
+
+    def _campaign_from_row(self, row):
+        log_data = {'id': row['id']}
+        for column in self.CAMPAIGN_COLUMNS:
+            if row[column] is not None:
+                log_data[column] = row[column]
+        if row['extra']:
+            log_data.update(json.loads(row['extra']))
+        return log_data
+
+    def campaign_ids(self):
+        return [row['id'] for row in self._connection().execute("SELECT id FROM campaigns")]
+
+    def load(self, campaign_id):
+        conn = self._connection()
+        row = conn.execute("SELECT * FROM campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No campaign log for {campaign_id}")
+        log_data = self._campaign_from_row(row)
+        log_data['emails'] = [self._entry_from_row(entry_row) for entry_row in conn.execute(
+            f"SELECT s.*, {', '.join(f'f.{c}' for c in self.FOLLOWUP_COLUMNS)} FROM sends s "
+            "LEFT JOIN followups f USING (campaign_id, recipient) WHERE s.campaign_id = ? ORDER BY s.seq", (campaign_id,))]
+        return log_data
+
+    def load_all(self):
+        return {campaign_id: self.load(campaign_id) for campaign_id in self.campaign_ids()}
+
+    def campaign_summaries(self):
+        rows = self._connection().execute(
+            "SELECT c.*, (SELECT COUNT(*) FROM sends s WHERE s.campaign_id = c.id) AS email_count, "
+            "(SELECT COUNT(*) FROM sends s LEFT JOIN followups f USING (campaign_id, recipient) "
+            " WHERE s.campaign_id = c.id AND s.status = 'sent' AND NOT COALESCE(s.flag_no_followup, 0) "
+            " AND COALESCE(f.followup_status, '') != 'Replied') AS unreplied_count FROM campaigns c")
+        return [dict(self._campaign_from_row(row), email_count=row['email_count'], unreplied_count=row['unreplied_count']) for row in rows]
+
+    def append(self, campaign_id, record):
+        """Applies one journal record ({'op': 'email', 'entry': ..., totals}) in a single transaction."""
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO campaigns (id) VALUES (?) ON CONFLICT (id) DO NOTHING", (campaign_id,))
+            if record.get('op') == 'email':
+                self._upsert_entries(conn, campaign_id, [record['entry']])
+            totals = [key for key in ('total_sent', 'total_failed', 'total_bounced') if key in record]
+            if totals:
+                conn.execute(f"UPDATE campaigns SET {', '.join(f'{key} = ?' for key in totals)} WHERE id = ?",
+                             (*(record[key] for key in totals), campaign_id))
+            self._bump_revisions(conn, [campaign_id])
+
+    def save(self, log_data):
+        """Writes the campaign row and every email row."""
+        with self._transaction() as conn:
+            self._save_campaign_row(conn, log_data)
+            self._upsert_entries(conn, log_data['id'], log_data.get('emails', []))
+            self._bump_revisions(conn, [log_data['id']])
+
+    def compact(self, log_data):
+        """Email rows are written as they are appended, so only the campaign row needs updating."""
+        with self._transaction() as conn:
+            self._save_campaign_row(conn, log_data)
+            self._bump_revisions(conn, [log_data['id']])
+
+    def delete(self, campaign_id):
+        with self._transaction() as conn:
+            for table, column in (('sends', 'campaign_id'), ('followups', 'campaign_id'), ('replies', 'campaign_id'),
+                                  ('revisions', 'campaign_id'), ('campaigns', 'id')):
+                conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (campaign_id,))
+
+    def find_by_message_id(self, message_id):
+        row = self._connection().execute(
+            "SELECT campaign_id, recipient FROM sends WHERE message_id = ? UNION ALL "
+            "SELECT campaign_id, recipient FROM followups WHERE last_followup_message_id = ? LIMIT 1",
+            (message_id, message_id)).fetchone()
+        return (row['campaign_id'], row['recipient']) if row else None
+
+    def followup_candidates(self, log_data, due_before=None):
+        query = ("SELECT s.recipient FROM sends s LEFT JOIN followups f USING (campaign_id, recipient) "
+                 "WHERE s.campaign_id = ? AND s.status = 'sent' AND NOT COALESCE(s.flag_no_followup, 0) "
+                 "AND COALESCE(f.followup_status, '') != 'Replied'")
+        params = [log_data['id']]
+        if due_before:
+            query += " AND COALESCE(f.last_followup_at, s.timestamp, '') <= ?"
+            params.append(due_before)
+        return [row['recipient'] for row in self._connection().execute(query + " ORDER BY s.seq", params)]
+
+    def flag_no_followup(self, recipients, flagged_logs):
+        """
+        Flags the recipients (matched in normalize_email form) in every campaign with one indexed update per batch.
+        Returns {changed campaign id: how many of the flagged emails were awaiting a follow-up}.
+        """
+        recipients = list({normalize_email(recipient) for recipient in recipients})
+        changed = defaultdict(int)
+        with self._transaction() as conn:
+            for start in range(0, len(recipients), self.BATCH_SIZE):
+                batch = recipients[start:start + self.BATCH_SIZE]
+                # Same form as normalize_email, matching the sends_recipient_normalized index
+                where = f"lower(trim(recipient, char(32, 9, 13, 10))) IN ({', '.join('?' * len(batch))}) AND NOT COALESCE(flag_no_followup, 0)"
+                for row in conn.execute(
+                        "SELECT s.campaign_id, SUM(s.status = 'sent' AND COALESCE(f.followup_status, '') != 'Replied') AS unreplied "
+                        f"FROM sends s LEFT JOIN followups f USING (campaign_id, recipient) WHERE {where} GROUP BY s.campaign_id", batch):
+                    changed[row['campaign_id']] += row['unreplied']
+                conn.execute(f"UPDATE sends SET flag_no_followup = 1 WHERE {where}", batch)
+            self._bump_revisions(conn, changed)
+        return dict(changed)
+
+    def record_replies(self, replies):
+        """Stores detected replies: dicts with message_id, campaign_id, recipient and detected_at."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO replies (message_id, campaign_id, recipient, detected_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (message_id) DO NOTHING",
+                [(r['message_id'], r['campaign_id'], r['recipient'], r['detected_at']) for r in replies])
+
+    def import_json_logs(self, json_store):
+        """One-shot migration of the JSON logs (journals included). Returns how many campaigns were imported."""
+        conn = self._connection()
+        if conn.execute("SELECT value FROM meta WHERE key = 'json_logs_imported'").fetchone():
+            return 0
+        existing = set(self.campaign_ids())
+        imported = 0
+        for campaign_id in json_store.campaign_ids():
+            if campaign_id in existing:
+                continue
+            try:
+                self.save(json_store.load(campaign_id))
+                imported += 1
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"[LOG STORAGE] Could not import {campaign_id}: {e}")
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_logs_imported', ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                         (datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        return imported
+
+
+def create_log_store(writer=None):
+    """Returns the campaign log storage selected by config.LOG_STORAGE ("json" or "sqlite")."""
+    if config.LOG_STORAGE == "sqlite":
+        return SQLiteLogStore(config.LOG_DB_FILE)
+    return JSONLogStore(config.LOG_DIR, writer)
+
+
+# ------------------------- 4. Main Application Class ------------------------ #
 class EmailApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -65,10 +1839,12 @@ class EmailApp(ctk.CTk):
         self.followup_running = False
         self.followup_thread = None
         self.active_followup_info = {}
+        self._followup_counter_lock = threading.Lock()
+        self.followup_campaigns_label = None
         
         self.navigation_frame = None
         self.content_frame = None
-        self.all_campaign_logs = {}  # In-memory dictionary for campaign logs
+        self.all_campaign_logs = {}  # Campaign summaries (no per-email rows) by campaign id
         self.status_var = tk.StringVar(value="Status: Ready") # Initial status
         
         self.scheduled_campaigns = []
@@ -80,8 +1856,53 @@ class EmailApp(ctk.CTk):
         self.followup_bodies_cache = None
         self.blacklist_cache = None
         self.notifications_cache = None
+        # Message-IDs that already have a reply notification (built from notifications_cache on first use)
+        self._notified_message_ids = None
         
         self.new_notifications_count = tk.IntVar(value=0)
+
+        # Coalesces JSON file writes off the calling threads (config.WRITE_BEHIND_*)
+        self.file_writer = WriteBehindWriter(config.WRITE_BEHIND_INTERVAL, config.WRITE_BEHIND_FLUSH_EVERY,
+                                             config.WRITE_BEHIND_MAX_ATTEMPTS, self._report_write_error)
+
+        # Where campaign logs are kept (config.LOG_STORAGE)
+        self.log_store = create_log_store(self.file_writer)
+
+        # Campaign id -> (emails list, {recipient: entry}) for O(1) entry lookups
+        self._recipient_indexes = {}
+        # Fully loaded campaign logs by id: [log_data, number of users]. Rows are loaded on first
+        # use, shared while in use and dropped when the last user releases them.
+        self._open_campaign_logs = {}
+        self._open_campaign_logs_lock = threading.Lock()
+        # The log shown in the campaign details view, released by clear_content
+        self._viewed_campaign_log = None
+        # all_campaign_logs is mirrored to config.CAMPAIGN_MANIFEST_FILE once it has been loaded
+        self._manifest_lock = threading.Lock()
+        self._manifest_ready = False
+        # Campaign id -> log storage modification stamp the manifest summary matches (see _refresh_stale_summaries)
+        self._campaign_stamps = {}
+
+        # Body templates keyed by file name, invalidated when the file's mtime changes
+        self.template_cache = {}
+
+        # Per-account pacing and hourly/daily caps shared by campaigns and follow-ups
+        self.rate_limiter = AccountRateLimiter(config.RATE_LIMIT_JITTER, config.BACKOFF_PAUSE,
+                                               config.BACKOFF_MAX_SLOWDOWN, config.BACKOFF_RECOVERY)
+        self.rate_limiter.restore(self._load_from_file(config.RATE_LIMIT_STATE_FILE))
+
+        # Authenticated SMTP sessions shared by campaigns, follow-ups and notifications
+        self.smtp_pool = SMTPConnectionPool(config.SMTP_SESSION_MAX_MESSAGES, config.SMTP_NOOP_AFTER_IDLE)
+        # Logged-in IMAP sessions (inbox selected) shared by follow-ups and the reply checker
+        self.imap_pool = IMAPConnectionPool(config.IMAP_MAX_CONNECTIONS_PER_ACCOUNT, config.IMAP_NOOP_AFTER_IDLE, config.IMAP_TIMEOUT)
+
+        # Per-account IMAP high-water marks ({email: {uidvalidity, last_uid}}); the lock keeps the
+        # reply checker and follow-ups from syncing and writing notifications at the same time
+        self.imap_sync_state = self._load_from_file(config.IMAP_SYNC_STATE_FILE)
+        self._reply_sync_lock = threading.Lock()
+        # Sent emails still awaiting a reply, by Message-ID (built from the logs on first start)
+        self.pending_replies = self._load_pending_replies()
+        # IMAP IDLE watchers by account email (only used when REPLY_CHECK_MODE is "idle")
+        self.idle_watchers = {}
         
         # UI Widget References
         self.progress_bar = None
@@ -118,19 +1939,187 @@ class EmailApp(ctk.CTk):
         
         self.after(60000, self._check_schedule)
 
-    def _load_all_campaign_logs(self):
-        """Loads all campaign logs from the logs directory."""
-        logs = {}
-        for file in os.listdir(config.LOG_DIR):
-            if file.endswith(".json"):
-                log_filepath = os.path.join(config.LOG_DIR, file)
-                try:
-                    with open(log_filepath, 'r', encoding='utf-8') as f:
-                        log_data = json.load(f)
-                    logs[file] = log_data
-                except (json.JSONDecodeError, FileNotFoundError) as e:
-                    print(f"Error loading log file {file}: {e}")
-        return logs
+    def _load_campaign_summaries(self):
+        """Builds every campaign's summary from the log storage (slow: reads every log); logs in use keep their live counters."""
+        # Taken first: a log changed while the summaries are read then just looks stale next time
+        stamps = self.log_store.modification_stamps()
+        summaries = {summary['id']: summary for summary in self.log_store.campaign_summaries()}
+        with self._open_campaign_logs_lock:
+            open_logs = [log_data for log_data, _ in self._open_campaign_logs.values()]
+        for log_data in open_logs:
+            summaries[log_data['id']] = summarize_campaign_log(log_data)
+        self._remember_campaign_stamps(stamps)
+        return summaries
+
+    # --- Campaign manifest: every campaign's summary in one small file, read instead of the logs at startup ---
+    def _read_campaign_manifest(self):
+        """Returns the saved summaries by campaign id, or None if the manifest is missing, unreadable or for another storage."""
+        try:
+            manifest = self._read_json_file(config.CAMPAIGN_MANIFEST_FILE)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return None
+        if not isinstance(manifest, dict) or manifest.get('version') != 1 or manifest.get('storage') != config.LOG_STORAGE:
+            return None
+        self._campaign_stamps = dict(manifest.get('stamps') or {})
+        return manifest.get('campaigns', {})
+
+    def _save_campaign_manifest(self):
+        """Queues the manifest with the current summaries; repeated updates within a flush interval cost one write."""
+        if not self._manifest_ready:
+            return  # Nothing loaded yet: writing now would drop every campaign from it
+        with self._manifest_lock:
+            manifest = {'version': 1, 'storage': config.LOG_STORAGE, 'campaigns': dict(self.all_campaign_logs),
+                        'stamps': dict(self._campaign_stamps)}
+            self.file_writer.write(config.CAMPAIGN_MANIFEST_FILE, json.dumps(manifest))
+
+    def _update_campaign_summary(self, log_data, count_unreplied=False):
+        """Refreshes one campaign's summary and the manifest. Without count_unreplied the last known unreplied count is kept."""
+        # The log has changed (or is about to be written), so its stored stamp no longer vouches for the summary
+        self._campaign_stamps.pop(log_data['id'], None)
+        previous = self.all_campaign_logs.get(log_data['id'], {})
+        unreplied_count = None if count_unreplied else previous.get('unreplied_count', 0)
+        self.all_campaign_logs[log_data['id']] = summarize_campaign_log(log_data, unreplied_count)
+        self._save_campaign_manifest()
+
+    def _refresh_stale_summaries(self, summaries):
+        """
+        Checks manifest summaries against the log storage. Returns corrected summaries, or None if they were current.
+        A different set of campaigns means a full rebuild. Otherwise each campaign whose modification stamp differs
+        from the one saved with the manifest (changed since, or the app stopped while it was in use) is re-read.
+        """
+        stamps = self.log_store.modification_stamps()
+        if set(summaries) != set(stamps):
+            print("[MANIFEST] Campaign manifest is out of date, rebuilding it from the logs.")
+            return self._load_campaign_summaries()
+        stale = [campaign_id for campaign_id, stamp in stamps.items()
+                 if stamp is None or self._campaign_stamps.get(campaign_id) != stamp]
+        self._remember_campaign_stamps({campaign_id: stamp for campaign_id, stamp in stamps.items() if stamp is not None})
+        if not stale:
+            return None
+        summaries = dict(summaries)
+        for campaign_id in stale:
+            log_data = self._opened_campaign_log(campaign_id)
+            try:
+                summaries[campaign_id] = summarize_campaign_log(log_data or self._load_campaign_log(campaign_id))
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"Error loading log file {campaign_id}: {e}")
+        return summaries
+
+    def _remember_campaign_stamps(self, stamps):
+        """Records the stamps the summaries now match, except for logs in use (their summaries keep changing)."""
+        with self._open_campaign_logs_lock:
+            open_ids = set(self._open_campaign_logs)
+        self._campaign_stamps = {campaign_id: stamp for campaign_id, stamp in stamps.items() if campaign_id not in open_ids}
+
+    def shutdown(self):
+        """
+        Writes everything still queued, then saves the manifest with every log's current stamp so the
+        next start can trust its summaries without reading the logs. Waits at most
+        WRITE_BEHIND_SHUTDOWN_TIMEOUT seconds for each, so an unwritable file cannot hang the exit.
+        """
+        self.file_writer.flush(config.WRITE_BEHIND_SHUTDOWN_TIMEOUT)
+        if self._manifest_ready:
+            self._remember_campaign_stamps(self.log_store.modification_stamps())
+            self._save_campaign_manifest()
+        if not self.file_writer.stop(config.WRITE_BEHIND_SHUTDOWN_TIMEOUT):
+            for path in sorted(self.file_writer.pending_paths()):
+                print(f"[WRITER] Exiting without saving {path}.")
+
+    def _report_write_error(self, path, error):
+        """WriteBehindWriter.on_error: tells the user a queued save never reached the disk."""
+        self.after(0, lambda: messagebox.showerror(
+            "Save Error", f"Could not save {path}: {error}\n\nThe latest changes to this file were not saved."))
+
+    # --- Campaign log persistence (JSON files + journal, or SQLite; see create_log_store) ---
+    def _load_campaign_log(self, campaign_id):
+        return self.log_store.load(campaign_id)
+
+    def _acquire_campaign_log(self, campaign_id, log_data=None):
+        """
+        Returns the full log (with 'emails') of a campaign, loading it unless it is already in use.
+        A new campaign passes its log_data to register it. Pair with _release_campaign_log.
+        """
+        with self._open_campaign_logs_lock:
+            opened = self._open_campaign_logs.get(campaign_id)
+            if opened is None:
+                if log_data is None:
+                    log_data = self._load_campaign_log(campaign_id)
+                opened = self._open_campaign_logs[campaign_id] = [log_data, 0]
+            opened[1] += 1
+            return opened[0]
+
+    def _release_campaign_log(self, log_data):
+        """Drops the email rows once no view or engine uses the log any more; its summary stays in all_campaign_logs."""
+        campaign_id = log_data['id']
+        with self._open_campaign_logs_lock:
+            opened = self._open_campaign_logs.get(campaign_id)
+            if opened is None or opened[0] is not log_data:
+                return
+            opened[1] -= 1
+            if opened[1] == 0:
+                del self._open_campaign_logs[campaign_id]
+                self._recipient_indexes.pop(campaign_id, None)
+        # Recounted on every release, not just the last, so a view keeping the log open does not freeze the count
+        if campaign_id in self.all_campaign_logs:
+            self._update_campaign_summary(log_data, count_unreplied=True)
+
+    def _opened_campaign_log(self, campaign_id):
+        """The full log if some view or engine currently has it loaded, else None."""
+        with self._open_campaign_logs_lock:
+            opened = self._open_campaign_logs.get(campaign_id)
+        return opened[0] if opened else None
+
+    @contextlib.contextmanager
+    def _campaign_log(self, campaign_id):
+        log_data = self._acquire_campaign_log(campaign_id)
+        try:
+            yield log_data
+        finally:
+            self._release_campaign_log(log_data)
+
+    def _recipient_index(self, log_data):
+        """Returns the recipient -> entry map for a campaign log, built once per loaded emails list."""
+        emails = log_data.setdefault('emails', [])
+        cached = self._recipient_indexes.get(log_data.get('id'))
+        if cached is not None and cached[0] is emails:
+            return cached[1]
+        index = {entry.get('recipient'): entry for entry in emails}
+        self._recipient_indexes[log_data.get('id')] = (emails, index)
+        return index
+
+    def _append_email_entry(self, log_data, entry):
+        """Appends an entry to a campaign log and keeps its recipient index in sync."""
+        index = self._recipient_index(log_data)
+        log_data['emails'].append(entry)
+        index[entry.get('recipient')] = entry
+
+    def _append_campaign_journal(self, campaign_id, record):
+        """Records one result without rewriting the whole log."""
+        self.log_store.append(campaign_id, record)
+
+    def _save_campaign_log(self, log_data):
+        """Writes the full campaign log."""
+        self.log_store.save(log_data)
+        self._update_campaign_summary(log_data)
+
+    def _compact_campaign_log(self, log_data):
+        """Makes the stored log match log_data after its results were appended one by one."""
+        self.log_store.compact(log_data)
+        self._update_campaign_summary(log_data)
+
+    def _delete_campaign_log(self, campaign_id):
+        with self._open_campaign_logs_lock:
+            self._open_campaign_logs.pop(campaign_id, None)
+            self._recipient_indexes.pop(campaign_id, None)
+        self.all_campaign_logs.pop(campaign_id, None)
+        self._campaign_stamps.pop(campaign_id, None)
+        with self._reply_sync_lock:
+            if self.pending_replies:
+                for message_id in [m for m, record in self.pending_replies.items() if record['campaign_id'] == campaign_id]:
+                    del self.pending_replies[message_id]
+                self._save_pending_replies()
+        self.log_store.delete(campaign_id)
+        self._save_campaign_manifest()
 
     def _load_initial_data_async(self):
         """Loads logs and all caches in a separate thread and updates the UI."""
@@ -145,23 +2134,67 @@ class EmailApp(ctk.CTk):
         
         unread_count = sum(1 for n in self.notifications_cache if not n.get('seen', False))
         
-        logs = self._load_all_campaign_logs()
-        
-        self.after(0, self._update_initial_ui, logs, unread_count)
+        if isinstance(self.log_store, SQLiteLogStore):
+            imported = self.log_store.import_json_logs(JSONLogStore(config.LOG_DIR))
+            if imported:
+                print(f"[LOG STORAGE] Imported {imported} campaign log(s) from {config.LOG_DIR} into {config.LOG_DB_FILE}.")
+
+        # The manifest is enough to show every list; the logs are only read if it is missing or stale
+        logs = self._read_campaign_manifest()
+        if logs is not None:
+            self.after(0, self._update_initial_ui, logs, unread_count)
+
+        with self._reply_sync_lock:
+            if self.pending_replies is None:
+                self.pending_replies = self._rebuild_pending_replies()
+                self._save_pending_replies()
+
+        if logs is None:
+            print("[MANIFEST] No campaign manifest found, building it from the logs.")
+            self.after(0, self._update_initial_ui, self._load_campaign_summaries(), unread_count)
+        else:
+            refreshed = self._refresh_stale_summaries(logs)
+            if refreshed is not None:
+                self.after(0, self._apply_campaign_summaries, logs, refreshed)
 
     def _update_initial_ui(self, logs, unread_count):
         """Callback to update in-memory logs and refresh UI after async load."""
-        self.all_campaign_logs = logs
+        # A copy: the background refresh compares against the dict it was given (_apply_campaign_summaries)
+        self.all_campaign_logs = dict(logs)
+        self._manifest_ready = True
+        self._save_campaign_manifest()
         self.new_notifications_count.set(unread_count) 
         self.status_var.set("Status: All logs and data loaded and ready.")
         self.show_dashboard_ui()
 
+    def _apply_campaign_summaries(self, previous, refreshed):
+        """
+        Merges summaries rebuilt in the background from `previous` (the manifest shown meanwhile) by id.
+        Logs in use and summaries that changed since (a campaign started, compacted or deleted in the
+        meantime) keep what they show now.
+        """
+        with self._open_campaign_logs_lock:
+            open_ids = set(self._open_campaign_logs)
+        for campaign_id in set(previous) | set(refreshed):
+            if campaign_id in open_ids or self.all_campaign_logs.get(campaign_id) is not previous.get(campaign_id):
+                continue
+            if campaign_id in refreshed:
+                self.all_campaign_logs[campaign_id] = refreshed[campaign_id]
+            else:
+                self.all_campaign_logs.pop(campaign_id, None)
+        self._save_campaign_manifest()
+        self._refresh_campaign_logs()
+
     def _update_live_ui(self, sent, failed, total, index, campaign_id, campaign_name):
         """Updates UI elements with live campaign progress."""
         if self.progress_bar and self.progress_bar.winfo_exists():
             if total > 0:
                 self.progress_bar.set((index + 1) / total)
-            self.status_var.set(f"Campaign in progress | Sent: {sent}, Failed: {failed}, Total: {total} | Remaining: {total - (sent + failed)}")
+            status_text = f"Campaign in progress | Sent: {sent}, Failed: {failed}, Total: {total} | Remaining: {total - (sent + failed)}"
+            account_states = self.rate_limiter.describe()
+            if account_states:
+                status_text += f" | {account_states}"
+            self.status_var.set(status_text)
         
         if self.analytics_tree and self.analytics_tree.winfo_exists():
             if campaign_id not in self.all_campaign_logs:
@@ -185,7 +2218,7 @@ class EmailApp(ctk.CTk):
         if self.viewing_campaign_details_id == campaign_id:
             if hasattr(self, 'email_tree') and self.email_tree and self.email_tree.winfo_exists():
                 try:
-                    latest_email_entry = self.all_campaign_logs[campaign_id]['emails'][-1]
+                    latest_email_entry = self._opened_campaign_log(campaign_id)['emails'][-1]
                     followup_status = latest_email_entry.get('followup_status', 'Not Sent')
                     row_values = (
                         latest_email_entry.get('recipient'),
@@ -196,7 +2229,7 @@ class EmailApp(ctk.CTk):
                         latest_email_entry.get('followup_count', 0)
                     )
                     self.email_tree.insert("", 0, values=row_values)
-                except (KeyError, IndexError) as e:
+                except (KeyError, IndexError, TypeError) as e:
                     print(f"Could not update detailed view in real-time: {e}")
 
     def _update_followup_live_ui(self, checked, sent, failed, total):
@@ -204,18 +2237,47 @@ class EmailApp(ctk.CTk):
         if self.followup_progress_bar and self.followup_progress_bar.winfo_exists():
             if total > 0:
                 self.followup_progress_bar.set(checked / total)
-            self.status_var.set(f"Follow-up in progress | Checked: {checked}/{total}, Sent: {sent}, Failed: {failed}")
+            status_text = f"Follow-up in progress | Checked: {checked}/{total}, Sent: {sent}, Failed: {failed}"
+            account_states = self.rate_limiter.describe()
+            if account_states:
+                status_text += f" | {account_states}"
+            self.status_var.set(status_text)
+        if self.followup_campaigns_label and self.followup_campaigns_label.winfo_exists():
+            self.followup_campaigns_label.configure(text=self._describe_followup_campaigns())
+
+    def _describe_followup_campaigns(self):
+        with self._followup_counter_lock:
+            counts = list(self.active_followup_info.get('campaigns', {}).values())
+        return "\n".join(f"{c['name']}: {c['checked']}/{c['total']} checked, {c['sent']} sent, {c['failed']} failed" for c in counts)
             
+    def _read_json_file(self, filepath):
+        """Reads a JSON file, preferring a newer version still queued in the file writer."""
+        pending = self.file_writer.pending(filepath)
+        if pending is not None:
+            return json.loads(pending)
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _load_from_file(self, filepath):
         """Helper to load JSON file and handle errors."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = self._read_json_file(filepath)
+            if filepath == config.BLACKLIST_FILE and isinstance(data, dict):
+                data = self._normalize_blacklist(data)
+            return data
         except (json.JSONDecodeError, FileNotFoundError):
-            if filepath == config.BLACKLIST_FILE:
+            if filepath in (config.BLACKLIST_FILE, config.IMAP_SYNC_STATE_FILE, config.RATE_LIMIT_STATE_FILE):
                 return {}
             return []
 
+    @staticmethod
+    def _normalize_blacklist(blacklist):
+        """Re-keys the DNC list by normalize_email, so entries saved with capitals still match; the first spelling wins."""
+        normalized = {}
+        for email_address, details in blacklist.items():
+            normalized.setdefault(normalize_email(email_address), details)
+        return normalized
+
     def load_json(self, filepath, cache_key=None):
         """Loads JSON data, using cache if available."""
         if cache_key and getattr(self, cache_key) is not None:
@@ -227,9 +2289,8 @@ class EmailApp(ctk.CTk):
         return data
 
     def save_json(self, filepath, data, cache_key=None):
-        """Saves JSON data and updates cache."""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        """Queues JSON data for writing and updates cache. Serialized now, so later changes to `data` are not picked up."""
+        self.file_writer.write(filepath, json.dumps(data, indent=2))
         if cache_key:
             setattr(self, cache_key, data)
             
@@ -241,6 +2302,38 @@ class EmailApp(ctk.CTk):
                 html_paragraphs.append(f"<p>{html_paragraph}</p>")
         return "\n".join(html_paragraphs)
 
+    def _get_template(self, file_name):
+        """Returns the raw, plain-text and HTML versions of a body file, reading it only when it changed."""
+        body_path = os.path.join(config.BODIES_DIR, file_name)
+        mtime = os.path.getmtime(body_path)
+        cached = self.template_cache.get(file_name)
+        if cached and cached['mtime'] == mtime:
+            return cached
+
+        with open(body_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if content.strip().startswith('<'):
+            plain_text_body = self.strip_html_tags(content)
+            html_body = content
+        else:
+            plain_text_body = content
+            html_body = self._convert_plain_text_to_html(content)
+
+        template = {'mtime': mtime, 'raw': content, 'plain': plain_text_body, 'html': html_body}
+        self.template_cache[file_name] = template
+        return template
+
+    def _load_templates(self, bodies):
+        """Resolves every body once per run; missing files map to None."""
+        templates = {}
+        for body_info in bodies:
+            try:
+                templates[body_info['file']] = self._get_template(body_info['file'])
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Could not load body template {body_info['file']}: {e}")
+                templates[body_info['file']] = None
+        return templates
+
 
     def _get_smtp_account_by_email(self, email):
         if self.smtp_cache is None:
@@ -250,33 +2343,295 @@ class EmailApp(ctk.CTk):
                 return smtp
         return None
 
-    def _has_replied_in_session(self, imap_session, email_entry):
-        if 'message_id' not in email_entry or not email_entry.get('message_id'):
-            return False, None
-            
-        try:
-            sent_date = datetime.datetime.strptime(email_entry['timestamp'], "%Y-%m-%d %H:%M:%S").strftime("%d-%b-%Y")
-            search_criteria = f'(SINCE {sent_date} (OR HEADER In-Reply-To "{email_entry["message_id"]}" HEADER References "{email_entry["message_id"]}"))'
-            status, messages = imap_session.search(None, search_criteria)
-            if status == 'OK' and messages[0]:
-                return True, messages[0].split()[-1] # Return True and the UID of the reply
-        except Exception as e:
-            print(f"IMAP check failed for {email_entry['recipient']}: {e}")
-        return False, None
+    def _find_replies_in_session(self, imap_session, entries, min_uid=None, deadline=None):
+        """
+        Checks a batch of log entries against the selected mailbox in one pass.
+        Returns ({original message_id: reply UID}, highest UID scanned, bounce report UIDs) for the
+        entries that got a reply, counting replies to their latest follow-up as well.
+        """
+        wanted = {}
+        oldest = None
+        for entry in entries:
+            if not entry.get('message_id'):
+                continue
+            wanted[entry['message_id']] = entry['message_id']
+            if entry.get('last_followup_message_id'):
+                wanted[entry['last_followup_message_id']] = entry['message_id']
+            try:
+                sent_at = datetime.datetime.strptime(entry['timestamp'], "%Y-%m-%d %H:%M:%S")
+                oldest = sent_at if oldest is None else min(oldest, sent_at)
+            except (KeyError, ValueError):
+                pass
+        if not wanted:
+            return {}, 0, []
+
+        found, highest_uid, report_uids = find_replies(imap_session, wanted, since=oldest, min_uid=min_uid, deadline=deadline)
+        return {wanted[message_id]: reply_uid for message_id, reply_uid in found.items()}, highest_uid, report_uids
+
+    def _load_pending_replies(self):
+        """Returns the saved awaiting-reply index, or None if it was never built."""
+        if not os.path.exists(config.PENDING_REPLIES_FILE) and self.file_writer.pending(config.PENDING_REPLIES_FILE) is None:
+            return None
+        data = self._load_from_file(config.PENDING_REPLIES_FILE)
+        if not isinstance(data, dict):
+            return None
+        # Share the strings repeated across records, as EmailLogEntry does for log rows
+        for record in data.values():
+            for key in ('campaign_id', 'campaign_name', 'subject', 'smtp_used'):
+                if type(record.get(key)) is str:
+                    record[key] = sys.intern(record[key])
+        return data
+
+    def _save_pending_replies(self):
+        """Caller holds _reply_sync_lock."""
+        if self.pending_replies is not None:
+            self.save_json(config.PENDING_REPLIES_FILE, self.pending_replies)
+
+    @staticmethod
+    def _pending_reply_cutoff():
+        # Timestamps use "%Y-%m-%d %H:%M:%S", so they compare correctly as strings
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=config.PENDING_REPLY_MAX_AGE_DAYS)
+        return cutoff.strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _pending_reply_record(campaign_id, campaign_name, entry, last_sent=None):
+        return {
+            "message_id": entry['message_id'], "recipient": entry['recipient'],
+            "campaign_id": campaign_id, "campaign_name": campaign_name,
+            "subject": entry.get('subject', ''), "smtp_used": entry['smtp_used'],
+            "timestamp": entry['timestamp'], "last_sent": last_sent or entry['timestamp'],
+            "last_followup_message_id": entry.get('last_followup_message_id')
+        }
+
+    def _rebuild_pending_replies(self):
+        """Builds the awaiting-reply index from every campaign log (first run, or when the file was removed), one log at a time."""
+        notified_message_ids = {n['original_message_id'] for n in self.notifications_cache or []}
+        cutoff = self._pending_reply_cutoff()
+        pending = {}
+        for campaign_id in self.log_store.campaign_ids():
+            try:
+                log_data = self._load_campaign_log(campaign_id)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"Error loading log file {campaign_id}: {e}")
+                continue
+            for entry in log_data['emails']:
+                if entry.get('status') == 'sent' and entry.get('message_id') and entry['message_id'] not in notified_message_ids:
+                    record = self._pending_reply_record(campaign_id, log_data.get('name', 'N/A'), entry)
+                    if record['last_sent'] >= cutoff:
+                        pending[entry['message_id']] = record
+        return pending
+
+    def _track_pending_reply(self, campaign_id, campaign_name, entry, followup_message_id=None):
+        """Adds a sent email to the awaiting-reply index, or refreshes it after a follow-up."""
+        with self._reply_sync_lock:
+            if self.pending_replies is None:
+                return
+            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") if followup_message_id else None
+            record = self.pending_replies.get(entry['message_id']) or self._pending_reply_record(campaign_id, campaign_name, entry)
+            if followup_message_id:
+                record['last_followup_message_id'] = followup_message_id
+                record['last_sent'] = now
+            self.pending_replies[entry['message_id']] = record
+
+    def _collect_unreplied_entries(self):
+        """
+        Groups the awaiting-reply index by sending account, first dropping entries whose last
+        send is older than PENDING_REPLY_MAX_AGE_DAYS. Caller holds _reply_sync_lock.
+        """
+        emails_to_check = defaultdict(list)
+        if not self.pending_replies:
+            return emails_to_check
+        cutoff = self._pending_reply_cutoff()
+        expired = [message_id for message_id, record in self.pending_replies.items() if record['last_sent'] < cutoff]
+        for message_id in expired:
+            del self.pending_replies[message_id]
+        for record in self.pending_replies.values():
+            emails_to_check[record['smtp_used']].append(record)
+        return emails_to_check
+
+    def _sync_account_replies(self, imap_session, smtp_email, entries, deadline=None):
+        """
+        Looks for replies in the selected inbox, scanning only mail that arrived after the last sync
+        of this account. A full scan (SINCE the oldest send) only happens on the first sync or when the
+        server's UIDVALIDITY changed. Bounce reports found in the same pass are downloaded and parsed.
+        Does not touch shared state, so accounts can be synced in parallel.
+        The inbox must have been selected before `entries` were taken: the saved position stops at the
+        UIDNEXT of that SELECT, so mail that arrived later is scanned again for emails tracked meanwhile.
+        Returns ({original message_id: reply UID}, bounces, new sync state or None).
+        """
+        uidvalidity = imap_status_value(imap_session, 'UIDVALIDITY')
+        uidnext = imap_status_value(imap_session, 'UIDNEXT')
+        state = self.imap_sync_state.get(smtp_email)
+
+        if state and uidvalidity is not None and state.get('uidvalidity') == uidvalidity:
+            replied, highest_uid, report_uids = self._find_replies_in_session(imap_session, entries, state['last_uid'] + 1, deadline)
+            last_uid = max(state['last_uid'], min(highest_uid, uidnext - 1) if uidnext else highest_uid)
+        else:
+            if state:
+                print(f"[REPLY CHECKER] UIDVALIDITY changed for {smtp_email}, running a full resync.")
+            replied, highest_uid, report_uids = self._find_replies_in_session(imap_session, entries, deadline=deadline)
+            last_uid = uidnext - 1 if uidnext else highest_uid
+
+        bounces = fetch_bounces(imap_session, report_uids) if report_uids else []
+        if uidvalidity is None:
+            return replied, bounces, None
+        return replied, bounces, {
+            'uidvalidity': uidvalidity, 'last_uid': last_uid,
+            'synced_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def _check_account_replies(self, smtp_account, collect_entries):
+        """
+        Worker for one account of the reply checker, bounded by REPLY_CHECK_ACCOUNT_TIMEOUT. Selects the
+        inbox (fresh UIDNEXT) before taking the entries to look for with collect_entries(account email).
+        Returns (entries, replied, bounces, sync state).
+        """
+        deadline = time.monotonic() + config.REPLY_CHECK_ACCOUNT_TIMEOUT
+        with self.imap_pool.session(smtp_account) as imap:
+            imap.select('inbox')
+            with self._reply_sync_lock:
+                entries = collect_entries(smtp_account['email'])
+            return (entries, *self._sync_account_replies(imap, smtp_account['email'], entries, deadline))
+
+    def _merge_reply_results(self, smtp_email, entries, replied, sync_state):
+        """
+        Records the sync state and a notification for every entry with a new reply.
+        Must be called with _reply_sync_lock held. Returns the new notifications.
+        """
+        if sync_state:
+            previous = self.imap_sync_state.get(smtp_email)
+            if previous and previous.get('uidvalidity') == sync_state['uidvalidity']:
+                sync_state['last_uid'] = max(sync_state['last_uid'], previous['last_uid'])
+            self.imap_sync_state[smtp_email] = sync_state
+
+        if self._notified_message_ids is None:
+            self._notified_message_ids = {n['original_message_id'] for n in self.notifications_cache or []}
+        new_notifications = []
+        replies = []
+        for entry in entries:
+            # Entries may come from outside the awaiting-reply index (aged out of it), so the guard
+            # against notifying twice is the set of notified Message-IDs, not index membership
+            if entry['message_id'] not in replied or entry['message_id'] in self._notified_message_ids:
+                continue
+            self.pending_replies.pop(entry['message_id'], None)
+            self._notified_message_ids.add(entry['message_id'])
+            print(f"New reply detected from {entry['recipient']} for campaign '{entry['campaign_name']}'")
+            new_notification = {
+                "recipient": entry['recipient'],
+                "campaign_name": entry['campaign_name'],
+                "subject": entry['subject'],
+                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "original_message_id": entry['message_id'],
+                "seen": False
+            }
+            self.notifications_cache.append(new_notification)
+            new_notifications.append(new_notification)
+            replies.append({"message_id": entry['message_id'], "campaign_id": entry['campaign_id'],
+                            "recipient": entry['recipient'], "detected_at": new_notification['timestamp']})
+        if replies:
+            self.log_store.record_replies(replies)
+        return new_notifications
+
+    def _record_bounces(self, bounces):
+        """
+        Marks emails that came back as failed deliveries as 'bounced' in their campaign logs, drops
+        them from the awaiting-reply index, and adds permanent (5.x.x) failures to the blocklist in
+        a single write. Returns how many log entries were marked.
+        """
+        failed = [bounce for bounce in bounces if bounce['action'] == 'failed']
+        if not failed:
+            return 0
+
+        marked = 0
+        bounced_by_campaign = defaultdict(list)
+        with self._reply_sync_lock:
+            pending = self.pending_replies or {}
+            by_recipient = None
+            for bounce in failed:
+                record = pending.get(bounce['original_message_id'])
+                if record is None or normalize_email(record['recipient']) != bounce['recipient']:
+                    if by_recipient is None:
+                        by_recipient = {normalize_email(r['recipient']): r for r in pending.values()}
+                    record = by_recipient.get(bounce['recipient'])
+                if record is not None:
+                    pending.pop(record['message_id'], None)
+                    campaign_id, recipient = record['campaign_id'], record['recipient']
+                else:
+                    # No longer awaiting a reply (e.g. aged out of the index): an indexed store can still find it
+                    found = None
+                    if self.log_store.indexed and bounce['original_message_id']:
+                        found = self.log_store.find_by_message_id(bounce['original_message_id'])
+                    if found is None:
+                        continue
+                    campaign_id, recipient = found
+                bounced_by_campaign[campaign_id].append((recipient, bounce))
+
+        # Each affected log is loaded once (or shared with a run that has it open) and released again
+        for campaign_id, bounced in bounced_by_campaign.items():
+            try:
+                log_data = self._acquire_campaign_log(campaign_id)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                print(f"[BOUNCES] Could not load campaign log {campaign_id}: {e}")
+                continue
+            try:
+                recipient_index = self._recipient_index(log_data)
+                for recipient, bounce in bounced:
+                    entry = recipient_index.get(recipient)
+                    if entry is None or entry.get('status') != 'sent':
+                        continue
+                    entry['status'] = 'bounced'
+                    entry['reason'] = f"Bounced: {bounce['status']} {bounce['diagnostic']}".strip()
+                    log_data['total_bounced'] = log_data.get('total_bounced', 0) + 1
+                    self._append_campaign_journal(campaign_id, {
+                        "op": "email", "entry": entry, "total_sent": log_data.get('total_sent', 0),
+                        "total_failed": log_data.get('total_failed', 0), "total_bounced": log_data['total_bounced']
+                    })
+                    marked += 1
+            finally:
+                self._release_campaign_log(log_data)
+
+        permanent = {normalize_email(bounce['recipient']): bounce for bounce in failed if bounce['status'].startswith('5')}
+        self.blacklist_cache = self.load_json(config.BLACKLIST_FILE, 'blacklist_cache')
+        new_entries = {recipient: bounce for recipient, bounce in permanent.items() if recipient not in self.blacklist_cache}
+        if new_entries:
+            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for recipient, bounce in new_entries.items():
+                self.blacklist_cache[recipient] = {
+                    "type": "bounce",
+                    "comment": f"{bounce['status']} {bounce['diagnostic']}".strip(),
+                    "date_added": now
+                }
+            self.save_json(config.BLACKLIST_FILE, self.blacklist_cache, 'blacklist_cache')
+
+        print(f"[BOUNCES] Marked {marked} email(s) as bounced, blocklisted {len(new_entries)} address(es).")
+        return marked
+
+    def _save_reply_state(self):
+        self.save_json(config.NOTIFICATIONS_FILE, self.notifications_cache, 'notifications_cache')
+        self.save_json(config.IMAP_SYNC_STATE_FILE, self.imap_sync_state)
+        self._save_pending_replies()
+        unread_count = sum(1 for n in self.notifications_cache if not n.get('seen', False))
+        self.after(0, lambda: self.new_notifications_count.set(unread_count))
 
     def _run_follow_up_campaign(self, campaign_id):
         self.followup_running = True
-        log_data = None
-        for file_name, data in self.all_campaign_logs.items():
-            if campaign_id in file_name:
-                log_data = data
-                break 
-
-        if not log_data:
-            self.after(0, lambda: messagebox.showerror("Error", f"Could not find campaign data for ID: {campaign_id}"))
-            self.followup_running = False
-            return
-        
+        self._run_follow_ups([campaign_id])
+
+    def _run_follow_up_sweep(self):
+        """Follows up every campaign at once: recipients whose last email is at least FOLLOWUP_MIN_DAYS old."""
+        self.followup_running = True
+        # Campaigns whose summary shows nobody awaiting a follow-up are not even loaded
+        campaign_ids = [campaign_id for campaign_id, summary in list(self.all_campaign_logs.items())
+                        if summary.get('unreplied_count', 1) and not (self.running and campaign_id == self.active_campaign_info.get('id'))]
+        self._run_follow_ups(campaign_ids, min_age_days=config.FOLLOWUP_MIN_DAYS)
+
+    def _run_follow_ups(self, campaign_ids, min_age_days=0):
+        """
+        Sends follow-ups for the eligible recipients of the given campaigns, grouped by the
+        account that sent them so each mailbox is checked once. With min_age_days only recipients
+        whose last email (first send or latest follow-up) is at least that old are included.
+        Each campaign's email rows are loaded for the run and released when it ends.
+        """
         self.after(0, self.show_follow_up_ui)
 
         followup_bodies = self.load_json(config.FOLLOWUP_BODIES_FILE, 'followup_bodies_cache')
@@ -285,100 +2640,187 @@ class EmailApp(ctk.CTk):
             self.followup_running = False
             return
 
+        due_before = (datetime.datetime.now() - datetime.timedelta(days=min_age_days)).strftime("%Y-%m-%d %H:%M:%S")
         self.blacklist_cache = self.load_json(config.BLACKLIST_FILE, 'blacklist_cache')
-        all_eligible_recipients = []
-        for email_entry in log_data.get('emails', []):
-            is_blacklisted = email_entry.get('recipient') in self.blacklist_cache
-            if email_entry.get('status') == 'sent' and not email_entry.get('flag_no_followup') and email_entry.get('followup_status') != 'Replied' and not is_blacklisted:
-                all_eligible_recipients.append(email_entry)
-
-        total_to_check = len(all_eligible_recipients)
-        self.active_followup_info = {'checked': 0, 'sent': 0, 'failed': 0, 'total': total_to_check}
-        
         recipients_by_smtp = defaultdict(list)
-        for entry in all_eligible_recipients:
-            recipients_by_smtp[entry['smtp_used']].append(entry)
+        campaign_counts = {}
+        logs = []
+        for campaign_id in campaign_ids:
+            try:
+                log_data = self._acquire_campaign_log(campaign_id)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                self.after(0, lambda err=e, c_id=campaign_id: messagebox.showerror("Error", f"Could not find campaign data for ID: {c_id} ({err})"))
+                continue
+            eligible = 0
+            recipient_index = self._recipient_index(log_data)
+            for recipient in self.log_store.followup_candidates(log_data, due_before if min_age_days else None):
+                email_entry = recipient_index.get(recipient)
+                if email_entry is not None and normalize_email(recipient) not in self.blacklist_cache:
+                    recipients_by_smtp[email_entry['smtp_used']].append((log_data, email_entry))
+                    eligible += 1
+            if eligible:
+                campaign_counts[log_data['id']] = {'name': log_data.get('name', 'N/A'), 'checked': 0, 'sent': 0, 'failed': 0, 'total': eligible}
+                logs.append(log_data)
+            else:
+                self._release_campaign_log(log_data)
+
+        total_to_check = sum(len(items) for items in recipients_by_smtp.values())
+        self.active_followup_info = {'checked': 0, 'sent': 0, 'failed': 0, 'total': total_to_check, 'campaigns': campaign_counts}
+        followup = {
+            'bodies': followup_bodies, 'templates': self._load_templates(followup_bodies),
+            'logs': {}, 'journaled': defaultdict(int), 'lock': threading.Lock()
+        }
 
-        log_file = os.path.join(config.LOG_DIR, log_data['id'])
         try:
-            for smtp_email, recipients in recipients_by_smtp.items():
-                if not self.followup_running: break
-                
+            # Phase 1: one reply (and bounce) pass over every account's inbox, all accounts at once
+            accounts = {}
+            for smtp_email, items in recipients_by_smtp.items():
                 smtp_account = self._get_smtp_account_by_email(smtp_email)
                 if not smtp_account or not smtp_account.get('imap_server'):
                     print(f"[SKIPPING]: No IMAP server configured for {smtp_email}.")
-                    self.active_followup_info['checked'] += len(recipients)
+                    for log_data, _ in items:
+                        self._count_followup(log_data['id'], checked=1)
                     continue
-
-                imap = None
-                try:
-                    imap = imaplib.IMAP4_SSL(smtp_account['imap_server'])
-                    imap.login(smtp_account['email'], smtp_account['password'])
-                    imap.select("inbox")
-                    
-                    for recipient_entry in recipients:
-                        if not self.followup_running: break
-                        
-                        self.active_followup_info['checked'] += 1
-                        
-                        has_replied, _ = self._has_replied_in_session(imap, recipient_entry)
-                        if has_replied:
-                            recipient_entry['followup_status'] = 'Replied'
-                        else:
-                            current_followup_count = recipient_entry.get('followup_count', 0)
-                            template_index = min(current_followup_count, len(followup_bodies) - 1)
-                            followup_body_info = followup_bodies[template_index]
-                            
-                            subject = f"Re: {recipient_entry['subject']}"
-                            body_path = os.path.join(config.BODIES_DIR, followup_body_info['file'])
-                            
-                            try:
-                                with open(body_path, 'r', encoding='utf-8') as f:
-                                    html_body = f.read()
-                                
-                                reply_to_id = recipient_entry.get('last_followup_message_id') or recipient_entry.get('message_id')
-                                
-                                new_message_id = self.send_email(smtp_account, recipient_entry['recipient'], subject, html_body, original_message_id=reply_to_id)
-
-                                if new_message_id:
-                                    recipient_entry['followup_status'] = 'Sent'
-                                    recipient_entry['followup_count'] = current_followup_count + 1
-                                    recipient_entry['last_followup_message_id'] = new_message_id
-                                    self.active_followup_info['sent'] += 1
-                                else:
-                                    recipient_entry['followup_status'] = 'Failed'
-                                    self.active_followup_info['failed'] += 1
-                            except Exception as e:
-                                print(f"Error sending follow-up to {recipient_entry['recipient']}: {e}")
-                                recipient_entry['followup_status'] = 'Failed'
-                                self.active_followup_info['failed'] += 1
-                        
-                        self.after(0, self._update_followup_live_ui, 
-                                   self.active_followup_info['checked'],
-                                   self.active_followup_info['sent'],
-                                   self.active_followup_info['failed'],
-                                   self.active_followup_info['total'])
-                        
-                        time.sleep(random.uniform(5, 10))
-                        
-                except Exception as e:
-                    print(f"IMAP or SMTP process failed for {smtp_email}: {e}")
-                    self.after(0, lambda err_msg=e: messagebox.showerror("Error", f"IMAP or SMTP error for {smtp_email}: {err_msg}"))
-                finally:
-                    if imap: imap.logout()
-                
-                self.save_json(log_file, log_data)
+                accounts[smtp_email] = smtp_account
+            replied = self._followup_reply_phase(accounts, recipients_by_smtp)
+
+            # Phase 2: each account sends its follow-ups in parallel with its own pacing
+            workers = []
+            for smtp_email, smtp_account in accounts.items():
+                if smtp_email in replied['failed']:
+                    error = replied['failed'][smtp_email]
+                    for log_data, _ in recipients_by_smtp[smtp_email]:
+                        self._count_followup(log_data['id'], checked=1)
+                    self.after(0, lambda err_msg=error, account=smtp_email: messagebox.showerror("Error", f"IMAP or SMTP error for {account}: {err_msg}"))
+                    continue
+                worker = threading.Thread(target=self._followup_worker, args=(smtp_account, recipients_by_smtp[smtp_email], replied['ids'], followup), daemon=True)
+                workers.append(worker)
+                worker.start()
+            for worker in workers:
+                worker.join()
 
         finally:
             self.followup_running = False
+            for touched_log in followup['logs'].values():
+                self._compact_campaign_log(touched_log)
+            for log_data in logs:
+                self._release_campaign_log(log_data)
+            with self._reply_sync_lock:
+                self._save_pending_replies()
             self.after(0, lambda: self.status_var.set("Follow-up process complete. Refreshing data..."))
             self.after(100, self._refresh_campaign_logs)
             self.after(200, self.show_follow_up_ui)
-            
+
+    def _followup_reply_phase(self, accounts, recipients_by_smtp):
+        """
+        Syncs each account's inbox once before any follow-up goes out. Every email that already has a
+        reply notification counts as replied, and recipients that aged out of the awaiting-reply index
+        are checked too. Returns {'ids': replied Message-IDs, 'failed': {account: error}}.
+        """
+        with self._reply_sync_lock:
+            self.notifications_cache = self.load_json(config.NOTIFICATIONS_FILE, 'notifications_cache')
+
+        def collect_entries(smtp_email):
+            entries = list(self._collect_unreplied_entries().get(smtp_email, []))
+            entries.extend(
+                self._pending_reply_record(log_data['id'], log_data.get('name', 'N/A'), entry)
+                for log_data, entry in recipients_by_smtp[smtp_email]
+                if entry.get('message_id') and entry['message_id'] not in self.pending_replies
+            )
+            return entries
+
+        replied_ids, failed_accounts = self._sync_reply_accounts(accounts, collect_entries)
+        with self._reply_sync_lock:
+            replied_ids |= {n['original_message_id'] for n in self.notifications_cache}
+        return {'ids': replied_ids, 'failed': failed_accounts}
+
+    def _count_followup(self, campaign_id, **amounts):
+        """Adds to the overall and per-campaign checked/sent/failed counters (workers run in parallel) and refreshes the progress display."""
+        with self._followup_counter_lock:
+            campaign_counts = self.active_followup_info['campaigns'].get(campaign_id, {})
+            for key, amount in amounts.items():
+                self.active_followup_info[key] += amount
+                if key in campaign_counts:
+                    campaign_counts[key] += amount
+            counts = (self.active_followup_info['checked'], self.active_followup_info['sent'],
+                      self.active_followup_info['failed'], self.active_followup_info['total'])
+        self.after(0, self._update_followup_live_ui, *counts)
+
+    def _checkpoint_followup(self, followup, log_data, entry):
+        """Journals one follow-up result so a crash mid-run loses nothing; compacts every JOURNAL_COMPACT_EVERY records."""
+        with followup['lock']:
+            followup['logs'][log_data['id']] = log_data
+            self._append_campaign_journal(log_data['id'], {"op": "email", "entry": entry})
+            followup['journaled'][log_data['id']] += 1
+            if followup['journaled'][log_data['id']] % config.JOURNAL_COMPACT_EVERY == 0:
+                self._compact_campaign_log(log_data)
+
+    def _followup_worker(self, smtp_account, items, replied, followup):
+        """Sends the follow-ups of one account, paced by the shared rate limiter."""
+        followup_bodies = followup['bodies']
+        for log_data, recipient_entry in items:
+            if not self.followup_running or self.rate_limiter.is_disabled(smtp_account):
+                break
+
+            if recipient_entry.get('status') == 'bounced':
+                self._count_followup(log_data['id'], checked=1)
+                continue
+            if recipient_entry.get('message_id') in replied:
+                recipient_entry['followup_status'] = 'Replied'
+                self._checkpoint_followup(followup, log_data, recipient_entry)
+                self._count_followup(log_data['id'], checked=1)
+                continue
+
+            if not self.rate_limiter.acquire(smtp_account, lambda: self.followup_running):
+                break
+
+            current_followup_count = recipient_entry.get('followup_count', 0)
+            followup_body_info = followup_bodies[min(current_followup_count, len(followup_bodies) - 1)]
+            subject = f"Re: {recipient_entry['subject']}"
+            try:
+                template = followup['templates'].get(followup_body_info['file'])
+                if template is None:
+                    raise FileNotFoundError(f"Body file not found: {followup_body_info['file']}")
+
+                reply_to_id = recipient_entry.get('last_followup_message_id') or recipient_entry.get('message_id')
+
+                new_message_id, outcome, reason = self._send_email_with_outcome(smtp_account, recipient_entry['recipient'], subject, template, original_message_id=reply_to_id)
+                if outcome == 'sent':
+                    self.rate_limiter.record_success(smtp_account)
+                elif outcome == 'auth':
+                    self.rate_limiter.disable(smtp_account, reason)
+                elif outcome == 'transient':
+                    self.rate_limiter.penalize(smtp_account, reason)
+                self.rate_limiter.record_send(smtp_account, (config.FOLLOWUP_DELAY_MIN, config.FOLLOWUP_DELAY_MAX))
+                self._save_rate_limit_state()
+
+                if new_message_id:
+                    recipient_entry['followup_status'] = 'Sent'
+                    recipient_entry['followup_count'] = current_followup_count + 1
+                    recipient_entry['last_followup_message_id'] = new_message_id
+                    recipient_entry['last_followup_at'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    self._track_pending_reply(log_data['id'], log_data.get('name', 'N/A'), recipient_entry, new_message_id)
+                    result = 'sent'
+                else:
+                    recipient_entry['followup_status'] = 'Failed'
+                    result = 'failed'
+            except FileNotFoundError as e:
+                # Nothing was sent, so the slot goes back to the account
+                self.rate_limiter.refund(smtp_account)
+                print(f"Error sending follow-up to {recipient_entry['recipient']}: {e}")
+                recipient_entry['followup_status'] = 'Failed'
+                result = 'failed'
+            except Exception as e:
+                print(f"Error sending follow-up to {recipient_entry['recipient']}: {e}")
+                recipient_entry['followup_status'] = 'Failed'
+                result = 'failed'
+
+            self._checkpoint_followup(followup, log_data, recipient_entry)
+            self._count_followup(log_data['id'], checked=1, **{result: 1})
+
     def _refresh_campaign_logs(self):
-        """Refreshes the in-memory log cache and updates relevant UI tables."""
-        self.status_var.set("Status: Refreshing all campaign data from disk...")
-        self.all_campaign_logs = self._load_all_campaign_logs()
+        """Updates the campaign tables from the in-memory summaries, which are kept current as logs change."""
+        self.status_var.set("Status: Refreshing campaign data...")
         if hasattr(self, 'analytics_tree') and self.analytics_tree and self.analytics_tree.winfo_exists():
             self._update_analytics_table()
         if hasattr(self, 'followup_campaign_tree') and self.followup_campaign_tree and self.followup_campaign_tree.winfo_exists():
@@ -455,65 +2897,72 @@ class EmailApp(ctk.CTk):
 
     def clear_content(self):
         self.viewing_campaign_details_id = None
+        if self._viewed_campaign_log is not None:
+            self._release_campaign_log(self._viewed_campaign_log)
+            self._viewed_campaign_log = None
         for widget in self.content_frame.winfo_children():
             widget.destroy()
 
     def strip_html_tags(self, html_text):
-        clean = re.compile('<.*?>')
-        return re.sub(clean, '', html_text)
+        return HTML_TAG_PATTERN.sub('', html_text)
 
-    def send_email(self, smtp, to_email, subject, content, original_message_id=None):
+    def _build_message(self, smtp, to_email, subject, content, original_message_id=None):
         """
-        Sends a single email and returns the generated Message-ID on success, or None on failure.
+        Builds the multipart message and returns it as a string together with its new Message-ID.
+        content is either raw body text or a cached template from _get_template.
         """
-        server = None
         msg_uuid = str(uuid.uuid4())
         domain = smtp['email'].split('@')[1]
         new_message_id = f"<{msg_uuid}@{domain}>"
 
-        try:
-            from_email_with_name = f"{smtp.get('name', smtp['email'])} <{smtp['email']}>"
-            
-            msg = MIMEMultipart("alternative")
-            msg['From'] = from_email_with_name
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg['Message-ID'] = new_message_id 
-            
-            if original_message_id:
-                msg['In-Reply-To'] = original_message_id
-                msg['References'] = original_message_id
-            
-            if content.strip().startswith('<'):
-                plain_text_body = self.strip_html_tags(content)
-                html_body = content
-            else:
-                plain_text_body = content
-                html_body = self._convert_plain_text_to_html(content)
-                
-            part1 = MIMEText(plain_text_body, 'plain')
-            part2 = MIMEText(html_body, 'html')
-            
-            msg.attach(part1)
-            msg.attach(part2)
-            
-            smtp_host = smtp.get('smtp_host', 'smtp.gmail.com')
-            smtp_port = smtp.get('smtp_port', 587)
+        from_email_with_name = f"{smtp.get('name', smtp['email'])} <{smtp['email']}>"
+        
+        msg = MIMEMultipart("alternative")
+        msg['From'] = from_email_with_name
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg['Message-ID'] = new_message_id 
+        
+        if original_message_id:
+            msg['In-Reply-To'] = original_message_id
+            msg['References'] = original_message_id
+        
+        if isinstance(content, dict):
+            plain_text_body = content['plain']
+            html_body = content['html']
+        elif content.strip().startswith('<'):
+            plain_text_body = self.strip_html_tags(content)
+            html_body = content
+        else:
+            plain_text_body = content
+            html_body = self._convert_plain_text_to_html(content)
             
-            server = smtplib.SMTP(smtp_host, smtp_port, timeout=10)
-            server.starttls()
-            server.login(smtp['email'], smtp['password'])
-            server.sendmail(smtp['email'], to_email, msg.as_string())
-            return new_message_id # Return the ID on success
+        part1 = MIMEText(plain_text_body, 'plain')
+        part2 = MIMEText(html_body, 'html')
+        
+        msg.attach(part1)
+        msg.attach(part2)
+        return msg.as_string(), new_message_id
+
+    def send_email(self, smtp, to_email, subject, content, original_message_id=None):
+        """
+        Sends a single email and returns the generated Message-ID on success, or None on failure.
+        """
+        message_id, _, _ = self._send_email_with_outcome(smtp, to_email, subject, content, original_message_id)
+        return message_id
+
+    def _send_email_with_outcome(self, smtp, to_email, subject, content, original_message_id=None):
+        """
+        Like send_email, but returns (message_id, outcome, reason) where outcome is 'sent',
+        'transient', 'permanent' or 'auth' (see classify_smtp_error).
+        """
+        try:
+            msg_string, new_message_id = self._build_message(smtp, to_email, subject, content, original_message_id)
+            self.smtp_pool.sendmail(smtp, to_email, msg_string)
+            return new_message_id, 'sent', "N/A"
         except Exception as e:
             print(f"ERROR in send_email to {to_email}: {e}")
-            return None # Return None on failure
-        finally:
-            if server:
-                try:
-                    server.quit()
-                except Exception:
-                    pass
+            return None, classify_smtp_error(e), describe_smtp_error(e)
 
     def run_campaign_thread(self, recipients, campaign_name, delay_min, delay_max, is_resume=False, log_data=None):
         """
@@ -522,11 +2971,24 @@ class EmailApp(ctk.CTk):
         self.running = True
         
         if is_resume and log_data:
+            # log_data may be just the campaign's summary; the resumed run needs its email rows
+            log_data = self._acquire_campaign_log(log_data['id'])
+            log_data.pop('incomplete', None)
             campaign_file_name = log_data['id']
-            recipients_to_send = [email_entry['recipient'] for email_entry in log_data['emails'] if email_entry['status'] != 'sent']
             sent = log_data['total_sent']
             failed = log_data['total_failed']
-            total_recipients = len(log_data.get('emails', []))
+            source_file = log_data.get('recipients_file')
+            if source_file and os.path.exists(source_file):
+                # Stream the original list again, leaving out everyone already handled
+                # Older logs kept recipients as written; the stream yields normalized addresses
+                done = {normalize_email(email_entry['recipient']) for email_entry in log_data['emails'] if email_entry['status'] in ('sent', 'skipped')}
+                recipients_to_send = RecipientStream(source_file, config.RECIPIENT_SHUFFLE, config.RECIPIENT_CHUNK_SIZE,
+                                                     config.RECIPIENT_PARTITION_SIZE, skip=done)
+                total_recipients = len(done) + len(recipients_to_send)
+            else:
+                recipients_to_send = [email_entry['recipient'] for email_entry in log_data['emails'] if email_entry['status'] != 'sent']
+                random.shuffle(recipients_to_send)
+                total_recipients = len(log_data.get('emails', []))
             
             self.active_campaign_info = {
                 'name': campaign_name, 'sent': sent, 'failed': failed,
@@ -544,14 +3006,19 @@ class EmailApp(ctk.CTk):
                 "timestamp_start": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "emails": []
             }
+            if isinstance(recipients, RecipientStream):
+                log_data["recipients_file"] = os.path.abspath(recipients.path)
+            log_data = self._acquire_campaign_log(campaign_file_name, log_data)
             
             self.active_campaign_info = {
                 'name': campaign_name, 'sent': 0, 'failed': 0,
                 'total': total_recipients, 'id': campaign_file_name
             }
+
+        if isinstance(recipients_to_send, RecipientStream) and recipients_to_send.report:
+            print(f"[RECIPIENTS] {format_recipient_report(recipients_to_send.report)}")
         
         self.after(0, self.show_campaign_ui)
-        self.after(0, lambda: self.all_campaign_logs.update({campaign_file_name: log_data}))
 
         smtps = self.load_json(config.SMTP_FILE, 'smtp_cache')
         subjects = self.load_json(config.SUBJECTS_FILE, 'subjects_cache')
@@ -560,111 +3027,373 @@ class EmailApp(ctk.CTk):
 
         if not smtps or not subjects or not bodies:
             self.running = False
+            self._release_campaign_log(log_data)
             self.after(0, lambda: messagebox.showerror("Error", "Please configure SMTP accounts, subjects, and email bodies first."))
             return
 
-        random.shuffle(recipients_to_send)
+        # Give disabled and slowed-down accounts another chance, unless a follow-up run is relying on that state
+        if not self.followup_running:
+            self.rate_limiter.reset()
+
+        # Recipients are streamed into a bounded queue so the whole list is never held in memory
+        recipient_queue = queue.Queue(maxsize=config.RECIPIENT_QUEUE_SIZE)
+
+        campaign = {
+            'id': campaign_file_name, 'name': campaign_name, 'log_data': log_data,
+            'is_resume': is_resume, 'subjects': subjects, 'bodies': bodies,
+            'templates': self._load_templates(bodies),
+            'delay_min': delay_min, 'delay_max': delay_max,
+            'sent': sent, 'failed': failed, 'processed': 0, 'total': total_recipients,
+            'retries': {}, 'retry_queue': queue.Queue(), 'retry_info': {}, 'in_flight': 0, 'feeding': True, 'feed_error': None,
+            'journaled': 0, 'lock': threading.Lock()
+        }
 
         try:
-            for idx, recipient in enumerate(recipients_to_send):
-                if not self.running: break
+            self._save_campaign_log(log_data)
+            threading.Thread(target=self._feed_recipients, args=(recipients_to_send, recipient_queue, campaign), daemon=True).start()
+
+            if config.SEND_ENGINE == "asyncio":
+                asyncio.run(self._run_campaign_async(smtps, recipient_queue, campaign))
+            else:
+                # One worker per SMTP account, all pulling from the same recipient queue
+                workers = [
+                    threading.Thread(target=self._campaign_worker, args=(smtp, recipient_queue, campaign), daemon=True)
+                    for smtp in smtps
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+
+        finally:
+            self.running = False
+            self._fail_pending_retries(campaign)
+            if campaign['feed_error']:
+                # Left without timestamp_end so the dashboard offers to resume it once the file is fixed
+                log_data['incomplete'] = f"Recipients file error: {campaign['feed_error']}"
+            else:
+                log_data["timestamp_end"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Write errors are reported by the file writer (_report_write_error)
+            try:
+                self._compact_campaign_log(log_data)
+                with self._reply_sync_lock:
+                    self._save_pending_replies()
+            finally:
+                self._release_campaign_log(log_data)
+            self.after(0, self._refresh_campaign_logs)
+
+            if campaign['feed_error']:
+                self.after(0, lambda: self.status_var.set(f"Campaign stopped early (recipients file error). Sent: {campaign['sent']}, Failed: {campaign['failed']}"))
+            else:
+                self.after(0, lambda: self.status_var.set(f"Campaign finished! Sent: {campaign['sent']}, Failed: {campaign['failed']}"))
+            self.after(0, lambda: self.show_dashboard_ui())
+
+    def _feed_recipients(self, recipients, recipient_queue, campaign):
+        """Producer thread: moves recipients from the (possibly streamed) source into the bounded queue."""
+        try:
+            for recipient in recipients:
+                while self.running:
+                    try:
+                        recipient_queue.put(recipient, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if not self.running:
+                    break
+        except ValueError as e:
+            print(f"Error reading recipients: {e}")
+            campaign['feed_error'] = str(e)
+            self.after(0, lambda message=str(e): messagebox.showerror(
+                "Recipients Error",
+                f"Could not read the rest of the recipients file:\n{message}\n\n"
+                "The campaign stops after the recipients already read and can be resumed once the file is fixed."))
+        finally:
+            campaign['feeding'] = False
+
+    def _campaign_has_work(self, campaign, recipient_queue):
+        # A send in flight may still put its recipient back for a retry, so workers wait for it
+        return (campaign['feeding'] or not recipient_queue.empty() or not campaign['retry_queue'].empty()
+                or campaign['in_flight'] > 0)
+
+    def _next_recipient(self, campaign, recipient_queue, timeout=0):
+        """
+        Returns the next recipient (retries first), or None if nothing is ready yet. The recipient
+        counts as in flight until _handle_send_outcome or _record_campaign_skip has dealt with it.
+        """
+        try:
+            recipient = campaign['retry_queue'].get_nowait()
+        except queue.Empty:
+            try:
+                recipient = recipient_queue.get(timeout=timeout) if timeout else recipient_queue.get_nowait()
+            except queue.Empty:
+                return None
+        with campaign['lock']:
+            campaign['in_flight'] += 1
+        return recipient
+
+    def _fail_pending_retries(self, campaign):
+        """
+        Logs recipients still waiting for a retry as failed once the workers are gone (every
+        account disabled, or the run was stopped), so none of them drops out of the log.
+        """
+        while True:
+            try:
+                recipient = campaign['retry_queue'].get_nowait()
+            except queue.Empty:
+                return
+            smtp, subject, body_info, reason = campaign['retry_info'][recipient]
+            self._record_campaign_result(campaign, recipient, smtp, subject, body_info, "failed",
+                                         f"{reason} (no account left to retry)", None)
+
+    def _campaign_worker(self, smtp, recipient_queue, campaign):
+        """Sends to recipients from the shared queue using one SMTP account and its own pacing."""
+        while self.running and self._campaign_has_work(campaign, recipient_queue) and not self.rate_limiter.is_disabled(smtp):
+            if not self.rate_limiter.acquire(smtp, lambda: self.running):
+                break
+            recipient = self._next_recipient(campaign, recipient_queue, timeout=0.5)
+            if recipient is None:
+                self.rate_limiter.refund(smtp)
+                continue
+
+            if normalize_email(recipient) in self.blacklist_cache:
+                self.rate_limiter.refund(smtp)
+                self._record_campaign_skip(campaign, recipient)
+                continue
+
+            subject = random.choice(campaign['subjects'])
+            body_info = random.choice(campaign['bodies'])
+            
+            outcome = "permanent"
+            reason = "Unknown error"
+            message_id = None
+            
+            try:
+                template = campaign['templates'].get(body_info['file'])
+                if template is None:
+                    raise FileNotFoundError(body_info['file'])
                 
-                if recipient in self.blacklist_cache:
-                    print(f"Skipping blacklisted recipient: {recipient}")
-                    if not is_resume:
-                        log_data["emails"].append({
-                            "recipient": recipient, "status": "skipped", "reason": "Blacklisted",
-                            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                    continue 
-
-                smtp = smtps[idx % len(smtps)]
-                subject = random.choice(subjects)
-                body_info = random.choice(bodies)
+                message_id, outcome, reason = self._send_email_with_outcome(smtp, recipient, subject, template)
+            except FileNotFoundError:
+                reason = f"Body file not found: {body_info['file']}"
+            except Exception as e:
+                reason = f"An error occurred: {e}"
+
+            self._handle_send_outcome(campaign, recipient, smtp, subject, body_info, outcome, reason, message_id)
+
+    async def _run_campaign_async(self, smtps, recipient_queue, campaign):
+        """Drives every account's SMTP conversations from a single event loop."""
+        semaphore = asyncio.Semaphore(config.ASYNC_MAX_CONNECTIONS)
+        lanes = [
+            self._async_campaign_worker(smtp, recipient_queue, campaign, semaphore)
+            for smtp in smtps
+            for _ in range(config.ASYNC_CONNECTIONS_PER_ACCOUNT)
+        ]
+        await asyncio.gather(*lanes)
+
+    async def _async_campaign_worker(self, smtp, recipient_queue, campaign, semaphore):
+        """Async counterpart of _campaign_worker; keeps its own SMTP connection open between sends."""
+        loop = asyncio.get_running_loop()
+        lane = {'client': None}
+        try:
+            while self.running and self._campaign_has_work(campaign, recipient_queue) and not self.rate_limiter.is_disabled(smtp):
+                wait = self.rate_limiter.try_acquire(smtp)
+                if wait > 0:
+                    await asyncio.sleep(min(wait, 1))
+                    continue
+                recipient = self._next_recipient(campaign, recipient_queue)
+                if recipient is None:
+                    self.rate_limiter.refund(smtp)
+                    await asyncio.sleep(0.1)
+                    continue
+
+                if normalize_email(recipient) in self.blacklist_cache:
+                    self.rate_limiter.refund(smtp)
+                    self._record_campaign_skip(campaign, recipient)
+                    continue
+
+                subject = random.choice(campaign['subjects'])
+                body_info = random.choice(campaign['bodies'])
                 
-                email_status = "failed"
+                outcome = "permanent"
                 reason = "Unknown error"
                 message_id = None
-                
+
                 try:
-                    body_filepath = os.path.join(config.BODIES_DIR, body_info['file'])
-                    with open(body_filepath, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    message_id = self.send_email(smtp, recipient, subject, content)
-                    
-                    if message_id:
-                        email_status = "sent"
-                        reason = "N/A"
-                    else:
-                        email_status = "failed"
-                        reason = "SMTP error"
+                    template = campaign['templates'].get(body_info['file'])
+                    if template is None:
+                        raise FileNotFoundError(body_info['file'])
+                    msg_string, new_message_id = self._build_message(smtp, recipient, subject, template)
+
+                    async with semaphore:
+                        await self._async_sendmail(lane, smtp, recipient, msg_string)
+
+                    message_id = new_message_id
+                    outcome = "sent"
+                    reason = "N/A"
                 except FileNotFoundError:
                     reason = f"Body file not found: {body_info['file']}"
                 except Exception as e:
-                    reason = f"An error occurred: {e}"
+                    print(f"ERROR in async send to {recipient}: {e}")
+                    outcome = classify_smtp_error(e)
+                    reason = describe_smtp_error(e)
 
-                email_entry_found = False
-                for entry in log_data['emails']:
-                    if entry['recipient'] == recipient:
-                        entry.update({
-                            "status": email_status, "reason": reason,
-                            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "message_id": message_id, "followup_status": "Not Sent",
-                            "followup_count": 0, "flag_no_followup": False
-                        })
-                        email_entry_found = True
-                        break
-                if not email_entry_found:
-                    log_data["emails"].append({
-                        "recipient": recipient, "smtp_used": smtp['email'], "subject": subject,
-                        "body_template_name": body_info['name'], "status": email_status,
-                        "reason": reason, "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "message_id": message_id, "followup_status": "Not Sent",
-                        "followup_count": 0, "flag_no_followup": False
-                    })
-                    
-                if email_status == "sent":
-                    sent += 1
-                else:
-                    failed += 1
-                
-                log_data['total_sent'] = sent
-                log_data['total_failed'] = failed
-                self.active_campaign_info.update({'sent': sent, 'failed': failed})
-                
-                self.after(0, lambda s=sent, f=failed, t=total_recipients, i=idx, c_id=campaign_file_name, c_name=campaign_name: self._update_live_ui(s, f, t, i, c_id, c_name))
-                log_file = os.path.join(config.LOG_DIR, campaign_file_name)
-                self.save_json(log_file, log_data)
-                
-                delay = random.uniform(delay_min, delay_max)
-                time.sleep(delay)
-        
+                await loop.run_in_executor(None, self._handle_send_outcome, campaign, recipient, smtp, subject, body_info, outcome, reason, message_id)
         finally:
-            self.running = False
-            log_data["timestamp_end"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            log_file = os.path.join(config.LOG_DIR, campaign_file_name)
+            if lane['client']:
+                await lane['client'].quit()
+
+    async def _async_sendmail(self, lane, smtp, recipient, msg_string):
+        """
+        Sends over the lane's connection (lane['client']). Like SMTPConnectionPool.sendmail, a connection
+        is replaced when it is worn out or fails its idle NOOP check, and one the server dropped is
+        reconnected once before the error counts against the send.
+        """
+        for attempt in range(2):
+            client = lane['client']
+            if client and (client.messages >= config.SMTP_SESSION_MAX_MESSAGES or not await client.is_healthy(config.SMTP_NOOP_AFTER_IDLE)):
+                await client.quit()
+                client = lane['client'] = None
+            if client is None:
+                client = AsyncSMTPClient(smtp.get('smtp_host', 'smtp.gmail.com'), smtp.get('smtp_port', 587),
+                                         use_starttls=smtp.get('smtp_starttls', True))
+                try:
+                    await client.connect(smtp)
+                except Exception:
+                    client.close()
+                    raise
+                lane['client'] = client
             try:
-                self.save_json(log_file, log_data)
-                self.after(0, self._refresh_campaign_logs)
-            except IOError as e:
-                self.after(0, lambda: messagebox.showerror("Log Save Error", f"Could not save campaign log: {e}"))
+                await client.sendmail(smtp['email'], recipient, msg_string)
+                return
+            except Exception as e:
+                disconnected = SMTPConnectionPool._is_disconnect(e)
+                if disconnected or not isinstance(e, smtplib.SMTPException) or client.writer is None:
+                    # client.writer is None once a failed RSET has closed it
+                    client.close()
+                    lane['client'] = None
+                if disconnected and attempt == 0:
+                    print(f"[ASYNC SMTP] Connection for {smtp['email']} was dropped ({e}). Reconnecting...")
+                    continue
+                raise
 
-            self.after(0, lambda: self.status_var.set(f"Campaign finished! Sent: {sent}, Failed: {failed}"))
-            self.after(0, lambda: self.show_dashboard_ui())
+    def _save_rate_limit_state(self):
+        """Queues the accounts' hourly/daily usage; the file writer merges the saves of a busy run into few writes."""
+        self.save_json(config.RATE_LIMIT_STATE_FILE, self.rate_limiter.snapshot())
+
+    def _handle_send_outcome(self, campaign, recipient, smtp, subject, body_info, outcome, reason, message_id):
+        """
+        Applies backoff for the sending account and records the result. Transient and auth
+        failures put the recipient back in the queue (up to SMTP_MAX_RETRIES times) so another
+        account or a later attempt can deliver it.
+        """
+        try:
+            delay_range = (campaign['delay_min'], campaign['delay_max'])
+            if outcome == 'sent':
+                self.rate_limiter.record_success(smtp)
+            elif outcome == 'auth':
+                self.rate_limiter.disable(smtp, reason)
+            elif outcome == 'transient':
+                self.rate_limiter.penalize(smtp, reason)
+            self.rate_limiter.record_send(smtp, delay_range)
+            self._save_rate_limit_state()
+
+            if outcome in ('transient', 'auth'):
+                with campaign['lock']:
+                    attempts = campaign['retries'].get(recipient, 0)
+                    if attempts < config.SMTP_MAX_RETRIES:
+                        campaign['retries'][recipient] = attempts + 1
+                        campaign['retry_info'][recipient] = (smtp, subject, body_info, reason)
+                        campaign['retry_queue'].put(recipient)
+                        return
+
+            email_status = "sent" if outcome == 'sent' else "failed"
+            self._record_campaign_result(campaign, recipient, smtp, subject, body_info, email_status, reason, message_id)
+        finally:
+            # Only after a retry is queued, so the other workers never see an empty campaign in between
+            with campaign['lock']:
+                campaign['in_flight'] -= 1
+
+    def _record_campaign_skip(self, campaign, recipient):
+        print(f"Skipping blacklisted recipient: {recipient}")
+        with campaign['lock']:
+            campaign['in_flight'] -= 1
+            campaign['processed'] += 1
+            if not campaign['is_resume']:
+                entry = EmailLogEntry({
+                    "recipient": recipient, "status": "skipped", "reason": "Blacklisted",
+                    "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                })
+                self._append_email_entry(campaign['log_data'], entry)
+                self._journal_campaign_entry(campaign, entry)
+
+    def _journal_campaign_entry(self, campaign, entry):
+        """Journals one outcome and compacts into the summary file every JOURNAL_COMPACT_EVERY records. Caller holds campaign['lock']."""
+        log_data = campaign['log_data']
+        self._append_campaign_journal(campaign['id'], {
+            "op": "email", "entry": entry,
+            "total_sent": log_data.get('total_sent', 0), "total_failed": log_data.get('total_failed', 0)
+        })
+        campaign['journaled'] += 1
+        if campaign['journaled'] % config.JOURNAL_COMPACT_EVERY == 0:
+            self._compact_campaign_log(log_data)
+            with self._reply_sync_lock:
+                self._save_pending_replies()
+
+    def _record_campaign_result(self, campaign, recipient, smtp, subject, body_info, email_status, reason, message_id):
+        """Writes one send outcome into the campaign log and pushes progress to the UI."""
+        with campaign['lock']:
+            log_data = campaign['log_data']
+            email_entry = self._recipient_index(log_data).get(recipient)
+            if email_entry is not None:
+                email_entry.update({
+                    "status": email_status, "reason": reason,
+                    "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "message_id": message_id, "followup_status": "Not Sent",
+                    "followup_count": 0, "flag_no_followup": False
+                })
+            else:
+                email_entry = EmailLogEntry({
+                    "recipient": recipient, "smtp_used": smtp['email'], "subject": subject,
+                    "body_template_name": body_info['name'], "status": email_status,
+                    "reason": reason, "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "message_id": message_id, "followup_status": "Not Sent",
+                    "followup_count": 0, "flag_no_followup": False
+                })
+                self._append_email_entry(log_data, email_entry)
+                
+            if email_status == "sent":
+                campaign['sent'] += 1
+                self._track_pending_reply(campaign['id'], campaign['name'], email_entry)
+                # Keeps the follow-up list current while the campaign runs; releasing the log recounts exactly
+                summary = self.all_campaign_logs.get(campaign['id'])
+                if summary is not None:
+                    summary['unreplied_count'] = summary.get('unreplied_count', 0) + 1
+            else:
+                campaign['failed'] += 1
+            campaign['processed'] += 1
+            sent, failed, idx = campaign['sent'], campaign['failed'], campaign['processed'] - 1
+            
+            log_data['total_sent'] = sent
+            log_data['total_failed'] = failed
+            self.active_campaign_info.update({'sent': sent, 'failed': failed})
             
+            self.after(0, lambda s=sent, f=failed, t=campaign['total'], i=idx, c_id=campaign['id'], c_name=campaign['name']: self._update_live_ui(s, f, t, i, c_id, c_name))
+            self._journal_campaign_entry(campaign, email_entry)
+
     def _check_for_resumable_campaign(self):
         """Finds the last campaign that was stopped before completion."""
         resumable_campaigns = []
-        logs = self._load_all_campaign_logs()
-        for file_name, log_data in logs.items():
-            if 'timestamp_end' not in log_data and log_data.get('total_sent', 0) + log_data.get('total_failed', 0) < len(log_data.get('emails', [])):
-                resumable_campaigns.append((file_name, log_data))
+        for summary in list(self.all_campaign_logs.values()):
+            # 'incomplete' marks a run that stopped early on its own, e.g. on a recipients file error
+            if 'timestamp_end' not in summary and (summary.get('incomplete') or
+                                                   summary.get('total_sent', 0) + summary.get('total_failed', 0) < summary.get('email_count', 0)):
+                resumable_campaigns.append(summary)
         
         if resumable_campaigns:
-            resumable_campaigns.sort(key=lambda x: datetime.datetime.strptime(x[1]['timestamp_start'], "%Y-%m-%d %H:%M:%S"), reverse=True)
-            return resumable_campaigns[0]
+            resumable_campaigns.sort(key=lambda x: datetime.datetime.strptime(x['timestamp_start'], "%Y-%m-%d %H:%M:%S"), reverse=True)
+            # Only the summary: run_campaign_thread loads the email rows when the campaign is resumed
+            return resumable_campaigns[0]['id'], resumable_campaigns[0]
         
         return None, None
 
@@ -762,11 +3491,20 @@ class EmailApp(ctk.CTk):
                 return
 
             selected_id_from_tree = selected_items[0]
-            log_data = self.all_campaign_logs.get(selected_id_from_tree)
-
-            if not log_data:
+            if selected_id_from_tree not in self.all_campaign_logs:
                 return
+            try:
+                log_data = self._acquire_campaign_log(selected_id_from_tree)
+            except (json.JSONDecodeError, FileNotFoundError) as e:
+                ctk.CTkLabel(right_frame, text=f"Could not load this campaign: {e}").pack(expand=True, padx=20, pady=20)
+                return
+            try:
+                show_campaign_log(log_data)
+            finally:
+                # The rows now live in the table, so the log itself is not kept in memory
+                self._release_campaign_log(log_data)
 
+        def show_campaign_log(log_data):
             scrollable_details = ctk.CTkScrollableFrame(right_frame)
             scrollable_details.pack(fill="both", expand=True, padx=10, pady=10)
 
@@ -935,7 +3673,8 @@ class EmailApp(ctk.CTk):
             server = None
             try:
                 server = smtplib.SMTP(smtp_account.get('smtp_host', 'smtp.gmail.com'), smtp_account.get('smtp_port', 587), timeout=10)
-                server.starttls()
+                if smtp_account.get('smtp_starttls', True):
+                    server.starttls()
                 server.login(smtp_account['email'], smtp_account['password'])
                 self.after(0, lambda: self.status_var.set(f"Status: Connection to {smtp_account['email']} successful!"))
             except Exception as e:
@@ -955,6 +3694,10 @@ class EmailApp(ctk.CTk):
                 indices_to_delete = sorted([int(s) for s in selected], reverse=True)
                 
                 new_smtps = [smtp for i, smtp in enumerate(smtps) if i not in indices_to_delete]
+                for i in indices_to_delete:
+                    if i < len(smtps):
+                        self.smtp_pool.close(smtps[i]['email'])
+                        self.imap_pool.close(smtps[i]['email'])
 
                 self.save_json(config.SMTP_FILE, new_smtps, 'smtp_cache')
                 populate_table()
@@ -1007,9 +3750,15 @@ class EmailApp(ctk.CTk):
 
                 smtps = self.load_json(config.SMTP_FILE, 'smtp_cache')
                 old_entry = smtps[index]
+                self.smtp_pool.close(old_entry['email'])
+                self.imap_pool.close(old_entry['email'])
+                self.rate_limiter.reset(old_entry['email'])
                 smtps[index] = {"name": name, "email": email, "password": password, "imap_server": imap_server, 
                                 "smtp_host": old_entry.get("smtp_host", "smtp.gmail.com"), 
                                 "smtp_port": old_entry.get("smtp_port", 587)}
+                for limit_key in ("hourly_limit", "daily_limit", "imap_port", "imap_ssl", "smtp_starttls"):
+                    if limit_key in old_entry:
+                        smtps[index][limit_key] = old_entry[limit_key]
                 self.save_json(config.SMTP_FILE, smtps, 'smtp_cache')
                 edit_win.destroy()
                 populate_table()
@@ -1407,34 +4156,10 @@ class EmailApp(ctk.CTk):
         self.status_var.set("Status: Templates and subjects reloaded.")
 
     def load_recipients(self, path):
-        recipients = []
+        """Returns a RecipientStream over the file; addresses are read lazily when the campaign runs."""
         if not os.path.exists(path):
             raise FileNotFoundError(f"Recipients file not found at: '{path}'")
-
-        try:
-            if path.lower().endswith(".csv"):
-                with open(path, newline='', encoding='utf-8') as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    email_key = next((k for k in reader.fieldnames if k.lower() == 'email'), None)
-                    if not email_key:
-                        raise ValueError("CSV file must contain an 'email' column.")
-                    
-                    for row in reader:
-                        email = row.get(email_key, '').strip()
-                        if email and '@' in email and '.' in email:
-                            recipients.append(email)
-            else:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        email = line.strip()
-                        if email and '@' in email and '.' in email:
-                            recipients.append(email)
-        except UnicodeDecodeError:
-            raise ValueError(f"Could not read file '{path}'. Please ensure it's a valid UTF-8 or plain text file.")
-        except Exception as e:
-            raise ValueError(f"Error reading recipients file '{path}': {e}")
-        
-        return recipients
+        return RecipientStream(path, config.RECIPIENT_SHUFFLE, config.RECIPIENT_CHUNK_SIZE, config.RECIPIENT_PARTITION_SIZE)
 
     def show_campaign_ui(self):
         self.clear_content()
@@ -1478,7 +4203,7 @@ class EmailApp(ctk.CTk):
                 resume_frame.pack(padx=20, pady=10, fill="x")
                 
                 campaign_name = resumable_campaign_data.get('name', 'Unnamed Campaign')
-                total_emails = len(resumable_campaign_data.get('emails', []))
+                total_emails = resumable_campaign_data.get('email_count', 0)
                 sent = resumable_campaign_data.get('total_sent', 0)
                 failed = resumable_campaign_data.get('total_failed', 0)
                 remaining = total_emails - (sent + failed)
@@ -1486,6 +4211,8 @@ class EmailApp(ctk.CTk):
                 ctk.CTkLabel(resume_frame, text=f"Campaign Name: {campaign_name}", font=("Arial", 14, "bold")).pack(pady=5)
                 ctk.CTkLabel(resume_frame, text=f"Last run on: {resumable_campaign_data.get('timestamp_start', 'N/A')}", font=("Arial", 12)).pack(pady=5)
                 ctk.CTkLabel(resume_frame, text=f"Progress: {sent} sent, {failed} failed, {remaining} remaining.", font=("Arial", 12)).pack(pady=5)
+                if resumable_campaign_data.get('incomplete'):
+                    ctk.CTkLabel(resume_frame, text=f"Stopped early: {resumable_campaign_data['incomplete']}", font=("Arial", 12)).pack(pady=5)
                 
                 def resume_action():
                     self.campaign_thread = threading.Thread(
@@ -1611,11 +4338,20 @@ class EmailApp(ctk.CTk):
     
     def export_campaign_log(self, file_name):
         """Exports a single campaign log to a CSV file."""
-        log_data = self.all_campaign_logs.get(file_name)
-        if not log_data:
+        if file_name not in self.all_campaign_logs:
             messagebox.showerror("Error", "Could not find the selected log data in memory.")
             return
+        try:
+            log_data = self._acquire_campaign_log(file_name)
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            messagebox.showerror("Error", f"Could not load the selected log: {e}")
+            return
+        try:
+            return self._export_campaign_log(log_data)
+        finally:
+            self._release_campaign_log(log_data)
 
+    def _export_campaign_log(self, log_data):
         default_filename = f"campaign_log_{log_data.get('name', 'export').replace(' ', '_')}_{log_data.get('id', 'full')}.csv"
         export_filepath = filedialog.asksaveasfilename(defaultextension=".csv",
                                                      initialfile=default_filename,
@@ -1672,9 +4408,8 @@ class EmailApp(ctk.CTk):
             if messagebox.askyesno("Export Before Deleting?", f"Campaign '{log_data['name']}' is older than 3 months. Do you want to export it before deleting?"):
                 self.export_campaign_log(file_name)
 
-            log_filepath = os.path.join(config.LOG_DIR, file_name)
             try:
-                os.remove(log_filepath)
+                self._delete_campaign_log(file_name)
                 if file_name in self.all_campaign_logs:
                     del self.all_campaign_logs[file_name]
                 self.status_var.set(f"Status: Archived and deleted log for '{log_data['name']}'.")
@@ -1698,9 +4433,8 @@ class EmailApp(ctk.CTk):
         
         files_to_delete = list(selected_items)
         for file_name in files_to_delete:
-            log_filepath = os.path.join(config.LOG_DIR, file_name)
             try:
-                os.remove(log_filepath)
+                self._delete_campaign_log(file_name)
                 if file_name in self.all_campaign_logs:
                     del self.all_campaign_logs[file_name]
                 self.analytics_tree.delete(file_name)
@@ -1844,6 +4578,13 @@ class EmailApp(ctk.CTk):
 
     def show_campaign_details(self, log_data):
         self.clear_content()
+        # The view keeps the email rows loaded (for searching) until clear_content releases them
+        try:
+            log_data = self._acquire_campaign_log(log_data['id'])
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            messagebox.showerror("Error", f"Could not load the campaign log: {e}")
+            return
+        self._viewed_campaign_log = log_data
         self.viewing_campaign_details_id = log_data.get('id')
         self.status_var.set(f"Status: Viewing details for '{log_data.get('name', 'campaign')}'.")
         ctk.CTkLabel(self.content_frame, text=f"Analytics for: {log_data.get('name')}", font=ctk.CTkFont(size=18, weight="bold")).pack(pady=10)
@@ -1919,8 +4660,8 @@ class EmailApp(ctk.CTk):
             if query.lower() in recipient.lower():
                 followup_status = email_entry.get('followup_status', 'Not Sent')
                 
-                if recipient in self.blacklist_cache:
-                    dnc_entry = self.blacklist_cache[recipient]
+                dnc_entry = self.blacklist_cache.get(normalize_email(recipient))
+                if dnc_entry is not None:
                     if dnc_entry.get('type') == 'lead':
                         followup_status = "Lead (DNC)"
                     else:
@@ -1957,6 +4698,10 @@ class EmailApp(ctk.CTk):
             if total > 0:
                 self.followup_progress_bar.set(checked / total)
             self.followup_progress_bar.pack(pady=10)
+
+            # Per-campaign progress, mostly useful during a multi-campaign sweep
+            self.followup_campaigns_label = ctk.CTkLabel(live_update_frame, text=self._describe_followup_campaigns(), justify="left")
+            self.followup_campaigns_label.pack(pady=5)
             
             def stop_followup_action():
                 self.followup_running = False
@@ -2028,7 +4773,21 @@ class EmailApp(ctk.CTk):
                 campaign_name = self.all_campaign_logs[campaign_id].get('name', 'N/A')
                 self.status_var.set(f"Status: Sending follow-ups for '{campaign_name}'.")
 
-            ctk.CTkButton(self.content_frame, text="Send Follow-ups", command=run_follow_up, fg_color="#27ae60", hover_color="#2ecc71").pack(pady=10)
+            def run_follow_up_sweep():
+                if not self.all_campaign_logs:
+                    messagebox.showerror("Error", "No campaigns found.")
+                    return
+                if not messagebox.askyesno("Confirm Sweep", f"Send follow-ups to every unreplied recipient across all campaigns whose last email is at least {config.FOLLOWUP_MIN_DAYS} day(s) old?"):
+                    return
+
+                self.followup_thread = threading.Thread(target=self._run_follow_up_sweep, daemon=True)
+                self.followup_thread.start()
+                self.status_var.set("Status: Sending follow-ups for all due campaigns.")
+
+            followup_button_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
+            followup_button_frame.pack(pady=10)
+            ctk.CTkButton(followup_button_frame, text="Send Follow-ups", command=run_follow_up, fg_color="#27ae60", hover_color="#2ecc71").pack(side="left", padx=10)
+            ctk.CTkButton(followup_button_frame, text="Follow Up All Due", command=run_follow_up_sweep, fg_color="#2980b9", hover_color="#3498db").pack(side="left", padx=10)
     
     def _update_followup_campaign_list(self, query="", order="Newest First"):
         if not self.followup_campaign_tree or not self.followup_campaign_tree.winfo_exists():
@@ -2044,18 +4803,11 @@ class EmailApp(ctk.CTk):
             campaigns.sort(key=lambda x: x.get('timestamp_start', '0'))
             
         filtered_campaigns = [c for c in campaigns if query.lower() in c.get('name', '').lower()]
-        
-        self.blacklist_cache = self.load_json(config.BLACKLIST_FILE, 'blacklist_cache')
 
         for campaign in filtered_campaigns:
             campaign_id = campaign.get('id')
             total_sent = campaign.get('total_sent', 0)
-            
-            unreplied_count = 0
-            for email_entry in campaign.get('emails', []):
-                is_blacklisted = email_entry.get('recipient') in self.blacklist_cache
-                if email_entry.get('status') == 'sent' and email_entry.get('followup_status') != 'Replied' and not email_entry.get('flag_no_followup') and not is_blacklisted:
-                    unreplied_count += 1
+            unreplied_count = campaign.get('unreplied_count', 0)
             
             start_datetime = campaign.get('timestamp_start', 'N/A')
             campaign_date = start_datetime.split(' ')[0] if ' ' in start_datetime else start_datetime
@@ -2070,70 +4822,97 @@ class EmailApp(ctk.CTk):
         while True:
             print("[REPLY CHECKER] Starting periodic check for new replies...")
             try:
-                self._check_for_replies_background()
+                idle_accounts = self._refresh_idle_watchers() if config.REPLY_CHECK_MODE == "idle" else set()
+                self._check_for_replies_background(skip_accounts=idle_accounts)
             except Exception as e:
                 print(f"[REPLY CHECKER] An error occurred during the check: {e}")
+            self.smtp_pool.close_idle(config.SMTP_SESSION_IDLE_TIMEOUT)
+            self.imap_pool.close_idle(config.IMAP_SESSION_IDLE_TIMEOUT)
             print(f"[REPLY CHECKER] Check finished. Waiting for {config.REPLY_CHECK_INTERVAL} seconds.")
             time.sleep(config.REPLY_CHECK_INTERVAL)
 
-    def _check_for_replies_background(self):
+    def _refresh_idle_watchers(self):
+        """Starts an IDLE watcher for each account with an IMAP server, restarting it when the account changed.
+        Returns the accounts currently covered by IDLE, which the periodic check can skip."""
+        self.smtp_cache = self.load_json(config.SMTP_FILE, 'smtp_cache')
+        accounts = {smtp['email']: smtp for smtp in self.smtp_cache if smtp.get('imap_server')}
+
+        for email_address, watcher in list(self.idle_watchers.items()):
+            if accounts.get(email_address) != watcher.account or (watcher.supported is not False and not watcher.is_alive()):
+                watcher.stop()
+                del self.idle_watchers[email_address]
+        for email_address, account in accounts.items():
+            if email_address not in self.idle_watchers:
+                watcher = IMAPIdleWatcher(account, self._on_idle_new_mail, config.IMAP_IDLE_RENEW, config.IMAP_RECONNECT_DELAY)
+                self.idle_watchers[email_address] = watcher
+                watcher.start()
+
+        return {email_address for email_address, watcher in self.idle_watchers.items() if watcher.supported}
+
+    def _on_idle_new_mail(self, smtp_email):
+        try:
+            self._check_for_replies_background(only_accounts={smtp_email})
+        except Exception as e:
+            print(f"[IMAP IDLE] Reply check for {smtp_email} failed: {e}")
+
+    def _check_for_replies_background(self, only_accounts=None, skip_accounts=()):
         """Scans all campaigns for replies and sends notifications if new ones are found."""
-        if not self.all_campaign_logs:
-            print("[REPLY CHECKER] No campaign logs loaded yet. Skipping check.")
+        if self.pending_replies is None:
+            print("[REPLY CHECKER] Reply index not loaded yet. Skipping check.")
             return
 
-        self.notifications_cache = self.load_json(config.NOTIFICATIONS_FILE, 'notifications_cache')
-        notified_message_ids = {n['original_message_id'] for n in self.notifications_cache}
-        
-        emails_to_check = defaultdict(list)
-        for campaign_log in self.all_campaign_logs.values():
-            for email_entry in campaign_log.get('emails', []):
-                if email_entry.get('status') == 'sent' and email_entry.get('message_id') and email_entry.get('message_id') not in notified_message_ids:
-                    entry_with_campaign = email_entry.copy()
-                    entry_with_campaign['campaign_name'] = campaign_log.get('name', 'N/A')
-                    emails_to_check[email_entry['smtp_used']].append(entry_with_campaign)
-        
-        if not emails_to_check:
+        with self._reply_sync_lock:
+            self.notifications_cache = self.load_json(config.NOTIFICATIONS_FILE, 'notifications_cache')
+            accounts = [
+                smtp_email for smtp_email in self._collect_unreplied_entries()
+                if smtp_email not in skip_accounts and (only_accounts is None or smtp_email in only_accounts)
+            ]
+
+        if not accounts:
             print("[REPLY CHECKER] No new emails to check for replies.")
             return
 
-        new_replies_found = False
-        for smtp_email, entries in emails_to_check.items():
-            smtp_account = self._get_smtp_account_by_email(smtp_email)
-            if not smtp_account or not smtp_account.get('imap_server'):
-                continue
+        self._sync_reply_accounts(accounts, lambda smtp_email: list(self._collect_unreplied_entries().get(smtp_email, [])))
 
-            imap = None
-            try:
-                imap = imaplib.IMAP4_SSL(smtp_account['imap_server'])
-                imap.login(smtp_account['email'], smtp_account['password'])
-                imap.select('inbox')
-                
-                for entry in entries:
-                    has_replied, reply_uid = self._has_replied_in_session(imap, entry)
-                    if has_replied:
-                        print(f"New reply detected from {entry['recipient']} for campaign '{entry['campaign_name']}'")
-                        new_notification = {
-                            "recipient": entry['recipient'],
-                            "campaign_name": entry['campaign_name'],
-                            "subject": entry['subject'],
-                            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "original_message_id": entry['message_id'],
-                            "seen": False
-                        }
-                        self.notifications_cache.append(new_notification)
-                        self._send_admin_notification(new_notification)
-                        new_replies_found = True
-            except Exception as e:
-                print(f"[REPLY CHECKER] IMAP error for {smtp_email}: {e}")
-            finally:
-                if imap:
-                    imap.logout()
+    def _sync_reply_accounts(self, accounts, collect_entries):
+        """
+        Syncs the inbox of every account in `accounts` in parallel. Each worker takes its entries with
+        collect_entries(account email) (called with _reply_sync_lock held) and otherwise only reads
+        shared state; results are merged into notifications_cache under the lock as they come in,
+        then bounces are recorded and everything is saved.
+        Returns (Message-IDs of all entries found replied, accounts whose check failed).
+        """
+        new_notifications = []
+        all_bounces = []
+        replied_message_ids = set()
+        failed_accounts = {}
+        with ThreadPoolExecutor(max_workers=config.REPLY_CHECK_WORKERS) as executor:
+            futures = {}
+            for smtp_email in accounts:
+                smtp_account = self._get_smtp_account_by_email(smtp_email)
+                if smtp_account and smtp_account.get('imap_server'):
+                    futures[executor.submit(self._check_account_replies, smtp_account, collect_entries)] = smtp_email
 
-        if new_replies_found:
-            self.save_json(config.NOTIFICATIONS_FILE, self.notifications_cache, 'notifications_cache')
-            unread_count = sum(1 for n in self.notifications_cache if not n.get('seen', False))
-            self.after(0, lambda: self.new_notifications_count.set(unread_count))
+            for future in as_completed(futures):
+                smtp_email = futures[future]
+                try:
+                    entries, replied, bounces, sync_state = future.result()
+                except Exception as e:
+                    print(f"[REPLY CHECKER] IMAP error for {smtp_email}: {e}")
+                    failed_accounts[smtp_email] = e
+                    continue
+                with self._reply_sync_lock:
+                    new_notifications.extend(self._merge_reply_results(smtp_email, entries, replied, sync_state))
+                replied_message_ids.update(replied)
+                all_bounces.extend(bounces)
+
+        self._record_bounces(all_bounces)
+
+        with self._reply_sync_lock:
+            self._save_reply_state()
+        for notification in new_notifications:
+            self._send_admin_notification(notification)
+        return replied_message_ids, failed_accounts
 
 
     def _send_admin_notification(self, notification_data):
@@ -2292,7 +5071,7 @@ class EmailApp(ctk.CTk):
             ))
 
     def _add_to_dnc_list(self, emails_text, type, comment=""):
-        emails_to_add = [email.strip() for email in emails_text.splitlines() if email.strip() and '@' in email]
+        emails_to_add = list(dict.fromkeys(normalize_email(email) for email in emails_text.splitlines() if email.strip() and '@' in email))
         if not emails_to_add:
             messagebox.showerror("Error", "No valid email addresses were provided.")
             return
@@ -2338,30 +5117,48 @@ class EmailApp(ctk.CTk):
         self.status_var.set(f"Status: Removed {removed_count} email(s) from DNC list.")
         self._populate_dnc_tree()
 
+    def _discount_flagged_summaries(self, unreplied_by_campaign):
+        """Takes emails that were just flagged no-follow-up off their campaigns' unreplied counts."""
+        for campaign_id, unreplied in unreplied_by_campaign.items():
+            summary = self.all_campaign_logs.get(campaign_id)
+            if summary is not None:
+                summary['unreplied_count'] = max(0, summary.get('unreplied_count', 0) - unreplied)
+                self._campaign_stamps.pop(campaign_id, None)
+        if unreplied_by_campaign:
+            self._save_campaign_manifest()
+
     def _update_logs_for_new_dnc(self, emails_to_flag):
         self.after(0, lambda: self.status_var.set("Status: Updating past campaign logs... Please wait."))
         
-        logs_to_resave = set()
-        for log_file, log_data in self.all_campaign_logs.items():
+        # Logs loaded right now are flagged in memory so running engines keep the flag; the store does the rest
+        with self._open_campaign_logs_lock:
+            open_logs = {campaign_id: log_data for campaign_id, (log_data, _) in self._open_campaign_logs.items()}
+        emails_to_flag = {normalize_email(email_address) for email_address in emails_to_flag}
+        logs_to_resave = {}
+        for log_file, log_data in open_logs.items():
             was_modified = False
-            for email_entry in log_data.get('emails', []):
-                if email_entry.get('recipient') in emails_to_flag:
-                    if not email_entry.get('flag_no_followup'):
-                        email_entry['flag_no_followup'] = True
-                        was_modified = True
+            # Logs may hold recipients as written, so match on the normalized address
+            for email_entry in log_data['emails']:
+                if normalize_email(email_entry.get('recipient', '')) in emails_to_flag and not email_entry.get('flag_no_followup'):
+                    email_entry['flag_no_followup'] = True
+                    was_modified = True
             
             if was_modified:
-                logs_to_resave.add(log_file)
-        
-        if logs_to_resave:
-            for log_file in logs_to_resave:
-                self.save_json(os.path.join(config.LOG_DIR, log_file), self.all_campaign_logs[log_file])
-            self.after(0, lambda: self.status_var.set(f"Status: Finished updating {len(logs_to_resave)} campaign logs."))
+                logs_to_resave[log_file] = log_data
+        
+        updated = self.log_store.flag_no_followup(emails_to_flag, logs_to_resave)
+        # The store reports how many flagged emails were awaiting a follow-up, so the summaries are
+        # corrected without reading the logs again; loaded logs are recounted when they are released
+        self.after(0, self._discount_flagged_summaries, {campaign_id: unreplied for campaign_id, unreplied in updated.items()
+                                                          if campaign_id not in open_logs and unreplied})
+        if updated:
+            self.after(0, lambda: self.status_var.set(f"Status: Finished updating {len(updated)} campaign logs."))
         else:
             self.after(0, lambda: self.status_var.set("Status: No past campaign logs needed updates."))
 
 
-# ------------------------- 4. Run Application ------------------------ #
+# ------------------------- 5. Run Application ------------------------ #
 if __name__ == "__main__":
     app = EmailApp()
     app.mainloop()
+    app.shutdown()
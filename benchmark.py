@@ -0,0 +1,559 @@
+"""
+End-to-end throughput benchmark for the Bulk Email Sender.
+
+Starts local SMTP and IMAP stand-in servers with configurable latency and failure rates,
+points a set of benchmark accounts at them and drives the application's real campaign,
+reply-check and follow-up code paths. Reports messages/sec, p50/p99 latency and peak memory
+for each phase. Nothing is sent over the internet; all data lives in a temporary directory.
+
+    python benchmark.py --recipients 10000 --accounts 4
+    python benchmark.py --recipients 1000000 --engine asyncio --smtp-latency 5 --trace-memory
+
+The application window is created hidden, so a display is still needed
+(on a Linux server run it under xvfb-run).
+"""
+import argparse
+import contextlib
+import json
+import os
+import queue
+import random
+import re
+import select
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+
+import config
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# ------------------------- 1. Stand-in Servers ------------------------ #
+BENCH_DOMAIN = "bench.example.com"
+SENDER_DOMAIN = "sender.example.com"
+HEADER_MESSAGE_ID_PATTERN = re.compile(rb'^Message-ID:\s*(<[^>]+>)', re.IGNORECASE | re.MULTILINE)
+FETCH_FIELDS_PATTERN = re.compile(r'HEADER\.FIELDS \(([^)]*)\)', re.IGNORECASE)
+
+
+class LatencyRecorder:
+    """Collects durations (in seconds) from many server threads."""
+
+    def __init__(self):
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples = []
+
+    def percentile(self, percent):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))]
+
+
+class Mailboxes:
+    """The IMAP stand-in's inboxes, one per account email, each a list of raw messages (UID = index + 1)."""
+
+    def __init__(self):
+        self._boxes = {}
+        self._lock = threading.Lock()
+
+    def add(self, account_email, raw_message):
+        with self._lock:
+            self._boxes.setdefault(account_email, []).append(raw_message)
+
+    def count(self, account_email):
+        with self._lock:
+            return len(self._boxes.get(account_email, []))
+
+    def get(self, account_email, uid):
+        with self._lock:
+            messages = self._boxes.get(account_email, [])
+            return messages[uid - 1] if 0 < uid <= len(messages) else None
+
+    def snapshot(self, account_email):
+        with self._lock:
+            return list(self._boxes.get(account_email, []))
+
+
+def build_reply(account_email, recipient, message_id):
+    return (f"From: {recipient}\r\nTo: {account_email}\r\nSubject: Re: your email\r\n"
+            f"Message-ID: <reply-{random.getrandbits(64):x}@{BENCH_DOMAIN}>\r\n"
+            f"In-Reply-To: {message_id}\r\nReferences: {message_id}\r\n\r\nThanks, tell me more.\r\n").encode()
+
+
+def build_bounce(account_email, recipient, message_id):
+    return (f"From: MAILER-DAEMON@{BENCH_DOMAIN}\r\nTo: {account_email}\r\nSubject: Undelivered Mail Returned to Sender\r\n"
+            f"MIME-Version: 1.0\r\nContent-Type: multipart/report; report-type=delivery-status; boundary=\"dsn\"\r\n\r\n"
+            f"--dsn\r\nContent-Type: text/plain\r\n\r\nDelivery failed.\r\n"
+            f"--dsn\r\nContent-Type: message/delivery-status\r\n\r\nReporting-MTA: dns; {BENCH_DOMAIN}\r\n\r\n"
+            f"Final-Recipient: rfc822; {recipient}\r\nAction: failed\r\nStatus: 5.1.1\r\n"
+            f"Diagnostic-Code: smtp; 550 5.1.1 User unknown\r\n\r\n"
+            f"--dsn\r\nContent-Type: text/rfc822-headers\r\n\r\nMessage-ID: {message_id}\r\n\r\n--dsn--\r\n").encode()
+
+
+class _StandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.server_address[1]
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+    """
+    Accepts EHLO, AUTH PLAIN, MAIL/RCPT/DATA, RSET, NOOP and QUIT. Recipients are refused with 550
+    at `failure_rate`; accepted messages are answered after `latency` seconds and, at `reply_rate`
+    and `bounce_rate`, get a reply or bounce report put in the sending account's stand-in inbox.
+    """
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        self._reply(f"220 {BENCH_DOMAIN} ESMTP ready")
+        sender = recipient = None
+        started = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(f"250-{BENCH_DOMAIN}\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n".encode())
+                self.wfile.flush()
+            elif verb == 'AUTH':
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == 'MAIL':
+                if sender is not None:
+                    # Like real MTAs: a transaction must end (DATA or RSET) before the next one starts
+                    self._reply("503 5.5.1 Error: nested MAIL command")
+                    continue
+                started = time.perf_counter()
+                sender = command.partition(':')[2].split()[0].strip('<>')
+                self._reply("250 2.1.0 OK")
+            elif verb == 'RCPT':
+                recipient = command.partition(':')[2].split()[0].strip('<>')
+                if server.failure_rate and random.random() < server.failure_rate:
+                    recipient = None
+                    self._reply("550 5.1.1 User unknown")
+                else:
+                    self._reply("250 2.1.5 OK")
+            elif verb == 'DATA':
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line)
+                if server.latency:
+                    time.sleep(server.latency)
+                self._deliver(sender, recipient, b"".join(data))
+                sender = recipient = None
+                self._reply("250 2.0.0 Queued")
+                if started is not None:
+                    server.latencies.add(time.perf_counter() - started)
+                server.count_message()
+            elif verb == 'RSET':
+                sender = recipient = None
+                self._reply("250 2.0.0 OK")
+            elif verb == 'NOOP':
+                self._reply("250 2.0.0 OK")
+            elif verb == 'QUIT':
+                self._reply("221 2.0.0 Bye")
+                return
+            else:
+                self._reply("502 5.5.2 Command not recognized")
+
+    def _deliver(self, sender, recipient, data):
+        server = self.server
+        if not sender or not recipient or not recipient.endswith(f"@{BENCH_DOMAIN}"):
+            return  # e.g. the admin notification for a reply
+        match = HEADER_MESSAGE_ID_PATTERN.search(data)
+        if not match:
+            return
+        message_id = match.group(1).decode()
+        chance = random.random()
+        if chance < server.reply_rate:
+            server.mailboxes.add(sender, build_reply(sender, recipient, message_id))
+        elif chance < server.reply_rate + server.bounce_rate:
+            server.mailboxes.add(sender, build_bounce(sender, recipient, message_id))
+
+
+class IMAPStandInHandler(socketserver.StreamRequestHandler):
+    """
+    Serves LOGIN, SELECT, UID SEARCH, UID FETCH (header fields or whole messages), IDLE, NOOP and
+    LOGOUT from the shared mailboxes, answering every command after `latency` seconds.
+    """
+
+    def _write(self, data):
+        self.wfile.write(data if isinstance(data, bytes) else data.encode())
+
+    def handle(self):
+        server = self.server
+        account_email = None
+        known = 0  # Messages the client has been told about (SELECT / IDLE)
+        self._write("* OK [CAPABILITY IMAP4rev1 IDLE] ready\r\n")
+        self.wfile.flush()
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            started = time.perf_counter()
+            tag, _, rest = line.decode('utf-8', 'replace').rstrip('\r\n').partition(' ')
+            command, _, args = rest.partition(' ')
+            command = command.upper()
+            if server.latency:
+                time.sleep(server.latency)
+
+            if command == 'CAPABILITY':
+                self._write(f"* CAPABILITY IMAP4rev1 IDLE\r\n{tag} OK done\r\n")
+            elif command == 'LOGIN':
+                account_email = args.split(' ', 1)[0].strip('"')
+                self._write(f"{tag} OK logged in\r\n")
+            elif command in ('SELECT', 'EXAMINE'):
+                exists = known = server.mailboxes.count(account_email)
+                self._write(f"* {exists} EXISTS\r\n* OK [UIDVALIDITY 1] UIDs valid\r\n"
+                            f"* OK [UIDNEXT {exists + 1}] next UID\r\n{tag} OK [READ-WRITE] done\r\n")
+            elif command == 'UID':
+                sub_command, _, sub_args = args.partition(' ')
+                if sub_command.upper() == 'SEARCH':
+                    self._search(tag, account_email, sub_args)
+                else:
+                    self._fetch(tag, account_email, sub_args)
+            elif command == 'IDLE':
+                known = self._idle(tag, account_email, known)
+                if known is None:
+                    return
+            elif command == 'NOOP':
+                self._write(f"{tag} OK done\r\n")
+            elif command == 'LOGOUT':
+                self._write(f"* BYE\r\n{tag} OK done\r\n")
+                self.wfile.flush()
+                return
+            else:
+                self._write(f"{tag} BAD unsupported\r\n")
+            self.wfile.flush()
+            server.latencies.add(time.perf_counter() - started)
+
+    def _idle(self, tag, account_email, known):
+        """
+        Reports new messages with untagged EXISTS until the client sends DONE. Returns the count
+        last reported, or None if the client went away.
+        """
+        mailboxes = self.server.mailboxes
+        count = mailboxes.count(account_email)
+        # Mail that arrived since SELECT goes out in the same packet as the continuation, as real servers may do
+        self._write(f"+ idling\r\n* {count} EXISTS\r\n" if count > known else "+ idling\r\n")
+        self.wfile.flush()
+        known = max(known, count)
+        while True:
+            # The client only sends DONE after reading "+ idling", so nothing sits unread in rfile here
+            if select.select([self.connection], [], [], 0.05)[0]:
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if line.strip().upper() == b'DONE':
+                    self._write(f"{tag} OK IDLE terminated\r\n")
+                    return known
+            count = mailboxes.count(account_email)
+            if count > known:
+                self._write(f"* {count} EXISTS\r\n")
+                self.wfile.flush()
+                known = count
+
+    def _search(self, tag, account_email, criteria):
+        uids = list(range(1, self.server.mailboxes.count(account_email) + 1))
+        match = re.search(r'UID (\d+):\*', criteria)
+        if match:
+            # Like a real server, "n:*" also matches the newest message when n is past the end
+            uids = [uid for uid in uids if uid >= int(match.group(1))] or uids[-1:]
+        self._write("".join(f" {uid}" for uid in uids).join(("* SEARCH", f"\r\n{tag} OK done\r\n")))
+
+    def _fetch(self, tag, account_email, args):
+        uid_set, _, items = args.partition(' ')
+        fields_match = FETCH_FIELDS_PATTERN.search(items)
+        wanted = {field.lower() for field in fields_match.group(1).split()} if fields_match else None
+        for uid in uid_set.split(','):
+            raw = self.server.mailboxes.get(account_email, int(uid)) if uid.isdigit() else None
+            if raw is None:
+                continue
+            if wanted is None:
+                section, payload = "BODY[]", raw
+            else:
+                headers = raw.split(b"\r\n\r\n", 1)[0].split(b"\r\n")
+                payload = b"".join(header + b"\r\n" for header in headers
+                                   if header.split(b":", 1)[0].decode().lower() in wanted) + b"\r\n"
+                section = f"BODY[HEADER.FIELDS ({fields_match.group(1).upper()})]"
+            self._write(f"* {uid} FETCH (UID {uid} {section} {{{len(payload)}}}\r\n".encode() + payload + b")\r\n")
+        self._write(f"{tag} OK done\r\n")
+
+
+def start_stand_in(handler, mailboxes, latency=0.0, failure_rate=0.0, reply_rate=0.0, bounce_rate=0.0):
+    """Starts a stand-in server on a free local port; returns (server, port)."""
+    server = _StandInServer(('127.0.0.1', 0), handler)
+    server.mailboxes = mailboxes
+    server.latency = latency
+    server.failure_rate = failure_rate
+    server.reply_rate = reply_rate
+    server.bounce_rate = bounce_rate
+    server.latencies = LatencyRecorder()
+    server.messages = 0
+    message_lock = threading.Lock()
+
+    def count_message():
+        with message_lock:
+            server.messages += 1
+    server.count_message = count_message
+    return server, server.start()
+
+
+# ------------------------- 2. Benchmark Data ------------------------ #
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def write_benchmark_data(args, smtp_port, imap_port):
+    """Writes accounts pointing at the stand-ins, one subject/body/follow-up template and the recipient file."""
+    accounts = [{
+        "name": f"Bench {i}", "email": f"bench{i}@{SENDER_DOMAIN}", "password": "bench",
+        "smtp_host": "127.0.0.1", "smtp_port": smtp_port, "smtp_starttls": False,
+        "imap_server": "127.0.0.1", "imap_port": imap_port, "imap_ssl": False
+    } for i in range(args.accounts)]
+    _write_json(config.SMTP_FILE, accounts)
+    _write_json(config.SUBJECTS_FILE, ["Quick question"])
+    with open(os.path.join(config.BODIES_DIR, "bench_body.html"), 'w') as f:
+        f.write("<p>Hi there,</p><p>We help teams send better email. Interested?</p>")
+    _write_json(config.EMAIL_BODIES_FILE, [{"name": "Bench", "file": "bench_body.html", "type": "html"}])
+    with open(os.path.join(config.BODIES_DIR, "bench_followup.txt"), 'w') as f:
+        f.write("Just following up on my last email.\n\nThanks")
+    _write_json(config.FOLLOWUP_BODIES_FILE, [{"name": "Bench follow-up", "file": "bench_followup.txt", "type": "text"}])
+
+    recipients_path = os.path.abspath("bench_recipients.txt")
+    with open(recipients_path, 'w') as f:
+        for i in range(args.recipients):
+            f.write(f"user{i}@{BENCH_DOMAIN}\n")
+    return recipients_path
+
+
+# ------------------------- 3. Benchmark Runner ------------------------ #
+def peak_memory_mb(trace_memory):
+    """Python heap peak of the current phase with --trace-memory, otherwise the process's peak RSS so far."""
+    if trace_memory:
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KB elsewhere
+
+
+def run_phase(name, work, latency_source, trace_memory, verbose):
+    """Runs one phase and returns its result row. work() returns the number of messages it handled."""
+    latency_source.latencies.reset()
+    if trace_memory:
+        tracemalloc.reset_peak()
+    print(f"[BENCHMARK] Running {name}...", file=sys.stderr)
+    started = time.perf_counter()
+    with contextlib.ExitStack() as output:
+        if not verbose:
+            output.enter_context(contextlib.redirect_stdout(output.enter_context(open(os.devnull, 'w'))))
+        handled = work()
+    elapsed = time.perf_counter() - started
+    return {
+        'phase': name, 'messages': handled, 'seconds': elapsed,
+        'rate': handled / elapsed if elapsed else 0.0,
+        'p50': latency_source.latencies.percentile(50), 'p99': latency_source.latencies.percentile(99),
+        'memory': peak_memory_mb(trace_memory)
+    }
+
+
+def run_benchmark(bench_app, args, recipients_path, smtp_server, imap_server, mailboxes):
+    """Drives a campaign, a full reply check and a follow-up run; returns one result row per phase."""
+    results = []
+    campaign = {}
+
+    def send_campaign():
+        stream = bench_app.load_recipients(recipients_path)
+        bench_app.run_campaign_thread(stream, "Benchmark", 0, 0)
+        campaign['id'] = bench_app.active_campaign_info['id']
+        return len(bench_app._load_campaign_log(campaign['id'])['emails'])
+    results.append(run_phase("campaign", send_campaign, smtp_server, args.trace_memory, args.verbose))
+
+    def check_replies():
+        pending = len(bench_app.pending_replies)
+        bench_app._check_for_replies_background()
+        return pending
+    results.append(run_phase("reply check", check_replies, imap_server, args.trace_memory, args.verbose))
+
+    def send_follow_ups():
+        bench_app._run_follow_up_campaign(campaign['id'])
+        return bench_app.active_followup_info.get('checked', 0)
+    results.append(run_phase("follow-ups", send_follow_ups, smtp_server, args.trace_memory, args.verbose))
+
+    inbox = [raw for account in range(args.accounts) for raw in mailboxes.snapshot(f"bench{account}@{SENDER_DOMAIN}")]
+    replies = sum(1 for raw in inbox if b"In-Reply-To" in raw)
+    print(f"[BENCHMARK] Engine: {config.SEND_ENGINE}, accounts: {args.accounts}, SMTP messages accepted: "
+          f"{smtp_server.messages}, replies: {replies}, bounce reports: {len(inbox) - replies}", file=sys.stderr)
+
+    if args.idle_messages:
+        wake_ups = types.SimpleNamespace(latencies=LatencyRecorder())
+        results.append(run_phase("IDLE wake-up", lambda: measure_idle_wake_ups(bench_app, mailboxes, args.idle_messages, wake_ups.latencies),
+                                 wake_ups, args.trace_memory, args.verbose))
+    return results
+
+
+def measure_idle_wake_ups(bench_app, mailboxes, count, latencies):
+    """
+    Runs the app's IMAPIdleWatcher against the stand-in and delivers `count` messages one at a
+    time, recording how long each takes to wake the watcher. Returns how many woke it.
+    """
+    import app as app_module
+
+    account = bench_app.load_json(config.SMTP_FILE, 'smtp_cache')[0]
+    woken = queue.Queue()
+    watcher = app_module.IMAPIdleWatcher(account, woken.put, reconnect_delay=1)
+    watcher.start()
+    try:
+        woken.get(timeout=10)  # The catch-up call made once the watcher is connected
+        time.sleep(0.2)  # Let it enter IDLE
+        delivered = 0
+        for i in range(count):
+            started = time.perf_counter()
+            mailboxes.add(account['email'], f"From: probe@{BENCH_DOMAIN}\r\nSubject: IDLE probe {i}\r\n\r\nHello\r\n".encode())
+            try:
+                woken.get(timeout=10)
+            except queue.Empty:
+                continue
+            latencies.add(time.perf_counter() - started)
+            delivered += 1
+        return delivered
+    finally:
+        watcher.stop()
+
+
+def format_results(results, trace_memory):
+    def ms(value):
+        return f"{value * 1000:.1f}" if value is not None else "n/a"
+    memory_label = "heap peak MB" if trace_memory else "peak RSS MB"
+    lines = [f"{'phase':<12} {'messages':>9} {'seconds':>9} {'msg/s':>9} {'p50 ms':>8} {'p99 ms':>8} {memory_label:>13}"]
+    for row in results:
+        memory = f"{row['memory']:.1f}" if row['memory'] is not None else "n/a"
+        lines.append(f"{row['phase']:<12} {row['messages']:>9} {row['seconds']:>9.2f} {row['rate']:>9.1f} "
+                     f"{ms(row['p50']):>8} {ms(row['p99']):>8} {memory:>13}")
+    return "\n".join(lines)
+
+
+def format_writer_stats(stats):
+    return (f"file writer: {stats['updates']} updates in {stats['files_written']} file writes over {stats['flushes']} flushes, "
+            f"flush avg {stats['avg_flush_ms']:.1f} ms, max {stats['max_flush_ms']:.1f} ms, "
+            f"peak queue {stats['peak_queue_depth']}, write errors {stats['errors']} ({stats['dropped']} given up)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark campaigns, reply checks and follow-ups against local stand-in servers.")
+    parser.add_argument("--recipients", type=int, default=10000, help="recipients in the campaign (default 10000)")
+    parser.add_argument("--accounts", type=int, default=4, help="sending accounts (default 4)")
+    parser.add_argument("--engine", choices=("threaded", "asyncio"), default=None, help="overrides SEND_ENGINE from config.py")
+    parser.add_argument("--smtp-latency", type=float, default=0.0, help="milliseconds the SMTP stand-in waits before accepting a message")
+    parser.add_argument("--imap-latency", type=float, default=0.0, help="milliseconds the IMAP stand-in waits before answering a command")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of recipients refused with 550 (0-1)")
+    parser.add_argument("--reply-rate", type=float, default=0.05, help="share of accepted emails that get a reply (0-1)")
+    parser.add_argument("--bounce-rate", type=float, default=0.01, help="share of accepted emails that get a bounce report (0-1)")
+    parser.add_argument("--idle-messages", type=int, default=20, help="messages delivered one by one to time IMAP IDLE wake-ups (0 = skip)")
+    parser.add_argument("--trace-memory", action="store_true", help="report the Python heap peak per phase (tracemalloc; slower)")
+    parser.add_argument("--verbose", action="store_true", help="show the application's own output")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary data directory")
+    return parser.parse_args(argv)
+
+
+# ------------------------- 4. Headless Application ------------------------ #
+def create_benchmark_app(app_module):
+    """The real EmailApp with its window hidden and the periodic reply checker switched off (phases call it directly)."""
+
+    class BenchmarkApp(app_module.EmailApp):
+        def _reply_checker_loop(self):
+            pass
+
+    bench_app = BenchmarkApp()
+    bench_app.withdraw()
+    return bench_app
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_dir = tempfile.mkdtemp(prefix="email_benchmark_")
+    os.chdir(data_dir)  # app.py creates its data files in the working directory on import
+    import app as app_module
+
+    if args.engine:
+        config.SEND_ENGINE = args.engine
+    config.FOLLOWUP_DELAY_MIN = config.FOLLOWUP_DELAY_MAX = 0
+    config.ADMIN_EMAIL = f"admin@{SENDER_DOMAIN}"
+
+    mailboxes = Mailboxes()
+    smtp_server, smtp_port = start_stand_in(SMTPStandInHandler, mailboxes, args.smtp_latency / 1000, args.failure_rate,
+                                            args.reply_rate, args.bounce_rate)
+    imap_server, imap_port = start_stand_in(IMAPStandInHandler, mailboxes, args.imap_latency / 1000)
+    recipients_path = write_benchmark_data(args, smtp_port, imap_port)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    bench_app = create_benchmark_app(app_module)
+    outcome = {}
+
+    def worker():
+        try:
+            outcome['results'] = run_benchmark(bench_app, args, recipients_path, smtp_server, imap_server, mailboxes)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            bench_app.after(0, bench_app.quit)
+
+    # Tk calls from the app's worker threads need the main loop running
+    threading.Thread(target=worker, daemon=True).start()
+    bench_app.mainloop()
+
+    # Everything queued must be on disk before the data directory goes away
+    bench_app.file_writer.stop()
+    writer_stats = bench_app.file_writer.stats()
+    bench_app.smtp_pool.close_all()
+    bench_app.imap_pool.close_all()
+    bench_app.destroy()
+    smtp_server.shutdown()
+    imap_server.shutdown()
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if args.keep:
+        print(f"[BENCHMARK] Data kept in {data_dir}", file=sys.stderr)
+    else:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if 'error' in outcome:
+        print(f"[BENCHMARK] Failed: {outcome['error']}", file=sys.stderr)
+        return 1
+    print(format_results(outcome['results'], args.trace_memory))
+    print(format_writer_stats(writer_stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,14 @@ EMAIL_BODIES_FILE = "bodies.json"
 FOLLOWUP_BODIES_FILE = "followup_bodies.json"
 BLACKLIST_FILE = "blacklist.json"
 NOTIFICATIONS_FILE = "notifications.json"
+# Remembers, per account, the last inbox message already checked for replies
+IMAP_SYNC_STATE_FILE = "imap_sync_state.json"
+# How much of each account's hourly/daily cap is used, so a restart does not reset the caps
+RATE_LIMIT_STATE_FILE = "rate_limit_state.json"
+# Index of sent emails still waiting for a reply; rebuilt from the logs if deleted
+PENDING_REPLIES_FILE = "pending_replies.json"
+# Counters and timestamps of every campaign, read at startup instead of every log; rebuilt if deleted
+CAMPAIGN_MANIFEST_FILE = "campaign_manifest.json"
 
 # These directories will be created to store logs and template files.
 BODIES_DIR = "bodies"
@@ -30,3 +38,105 @@ REPLY_CHECK_INTERVAL = 900
 # Default UI settings
 DEFAULT_APPEARANCE_MODE = "Dark" # "Dark" or "Light"
 DEFAULT_COLOR_THEME = "blue"     # "blue", "green", "dark-blue"
+
+# 4. SMTP Connection Settings
+# Campaigns and follow-ups reuse one logged-in SMTP session per account instead of
+# reconnecting for every email.
+# Number of emails sent over one session before it is closed and a fresh login is made.
+SMTP_SESSION_MAX_MESSAGES = 100
+# A session that has been idle for this many seconds is checked with NOOP before reuse.
+SMTP_NOOP_AFTER_IDLE = 30
+# Sessions idle for longer than this (in seconds) are closed by the background checker.
+SMTP_SESSION_IDLE_TIMEOUT = 600
+
+# 5. Sending Engine
+# "threaded" runs one worker thread per SMTP account.
+# "asyncio" drives all SMTP conversations from a single event loop with non-blocking sockets.
+SEND_ENGINE = "threaded"
+# Upper limit on SMTP conversations in flight at once when using the asyncio engine.
+ASYNC_MAX_CONNECTIONS = 200
+# Parallel connections opened per SMTP account by the asyncio engine. They share the account's
+# pacing and hourly/daily caps, so extra connections overlap slow sends without raising its send rate.
+ASYNC_CONNECTIONS_PER_ACCOUNT = 1
+
+# 6. Rate Limiting
+# Each SMTP account is paced on its own. Optional per-account caps can be added to an
+# account in smtp_list.json, e.g. "hourly_limit": 50, "daily_limit": 500 (0 or missing = no cap).
+# When True, the gap between two sends from one account is picked at random between the
+# minimum and maximum delay. When False, sends are spaced exactly by the minimum delay.
+RATE_LIMIT_JITTER = True
+# Delay range (in seconds) between two follow-up emails sent from the same account.
+FOLLOWUP_DELAY_MIN = 5
+FOLLOWUP_DELAY_MAX = 10
+# "Follow Up All Due" only includes recipients whose last email (the original or the latest
+# follow-up) was sent at least this many days ago.
+FOLLOWUP_MIN_DAYS = 3
+
+# 7. Adaptive Backoff
+# When a server answers with a throttling or temporary error (e.g. 421, 451, 454), only that
+# account is paused for BACKOFF_PAUSE seconds (multiplied by its current slowdown) and its
+# delays are doubled, up to BACKOFF_MAX_SLOWDOWN times the normal delay.
+BACKOFF_PAUSE = 60
+BACKOFF_MAX_SLOWDOWN = 8
+# After each successful send the slowdown is multiplied by this factor until it is back to 1.
+BACKOFF_RECOVERY = 0.8
+# How many times a recipient is put back in the queue after a temporary or login failure.
+SMTP_MAX_RETRIES = 2
+
+# 8. Campaign Log Settings
+# While a campaign runs, each result is appended to a small journal file next to its log.
+# Every JOURNAL_COMPACT_EVERY results the journal is folded back into the main log file.
+JOURNAL_COMPACT_EVERY = 500
+
+# 9. Recipient Loading
+# Recipient files are streamed in chunks instead of being loaded into memory at once.
+# RECIPIENT_QUEUE_SIZE caps how many addresses wait in memory for the sending workers.
+# Files with more than RECIPIENT_PARTITION_SIZE rows are deduplicated (and shuffled) through temporary
+# partition files, so memory use stays bounded by the partition size.
+RECIPIENT_CHUNK_SIZE = 10000
+RECIPIENT_QUEUE_SIZE = 5000
+RECIPIENT_PARTITION_SIZE = 100000
+RECIPIENT_SHUFFLE = True
+
+# 10. Reply Detection
+# "poll" checks every account's inbox each REPLY_CHECK_INTERVAL seconds.
+# "idle" keeps one IMAP IDLE connection per account and checks for replies as soon as the
+# server reports new mail. Accounts whose server does not support IDLE are still polled.
+REPLY_CHECK_MODE = "poll"
+# Servers end IDLE after about 30 minutes, so it is renewed after this many seconds.
+IMAP_IDLE_RENEW = 1500
+# Seconds to wait before reconnecting a dropped IDLE connection.
+IMAP_RECONNECT_DELAY = 30
+# Accounts checked for replies at the same time, and the most time one account may take
+# per check (in seconds) before it is skipped until the next one.
+REPLY_CHECK_WORKERS = 8
+REPLY_CHECK_ACCOUNT_TIMEOUT = 120
+# Timeout (in seconds) for a single IMAP network operation.
+IMAP_TIMEOUT = 30
+# Follow-ups and the reply checker share logged-in IMAP sessions. At most this many are
+# open per account at once (an IDLE watcher uses one more of its own).
+IMAP_MAX_CONNECTIONS_PER_ACCOUNT = 2
+# Sessions unused for IMAP_NOOP_AFTER_IDLE seconds are checked with NOOP before reuse, and
+# closed after IMAP_SESSION_IDLE_TIMEOUT seconds (longer than REPLY_CHECK_INTERVAL so they carry over).
+IMAP_NOOP_AFTER_IDLE = 60
+IMAP_SESSION_IDLE_TIMEOUT = 1200
+# Sent emails with no reply and no follow-up for this many days stop being checked for replies.
+PENDING_REPLY_MAX_AGE_DAYS = 30
+
+# 11. Campaign Log Storage
+# "json" keeps one JSON file per campaign in LOG_DIR (plus a journal while it runs).
+# "sqlite" keeps all campaigns in one indexed SQLite database (LOG_DB_FILE). On the first start
+# with "sqlite", the existing JSON logs are imported once; the JSON files are left in place.
+LOG_STORAGE = "json"
+LOG_DB_FILE = "campaigns.db"
+
+# 12. File Writes
+# Settings, logs and the manifest are written by a background thread. Updates to the same file
+# within WRITE_BEHIND_INTERVAL seconds are merged into one write, and a write starts early once
+# WRITE_BEHIND_FLUSH_EVERY updates are waiting. A write that fails WRITE_BEHIND_MAX_ATTEMPTS
+# times in a row is given up and reported. Everything pending is written on exit, waiting at
+# most WRITE_BEHIND_SHUTDOWN_TIMEOUT seconds.
+WRITE_BEHIND_INTERVAL = 1.0
+WRITE_BEHIND_FLUSH_EVERY = 100
+WRITE_BEHIND_MAX_ATTEMPTS = 3
+WRITE_BEHIND_SHUTDOWN_TIMEOUT = 10